@@ -25,5 +25,8 @@ setuptools.setup(
         "Development Status :: 4 - Beta",
     ],
     python_requires='>=3.6',
+    entry_points={
+        "console_scripts": ["tcxreader=tcxreader.cli:main"],
+    },
     test_suite="tests"
 )
@@ -3,5 +3,11 @@ from .tcx_track_point import TCXTrackPoint
 from .tcx_author import TCXAuthor
 from .tcx_exercise import TCXExercise
 from .tcx_lap import TCXLap
+from .tcx_read_stats import TCXReadStats, TCXStageStats
+from .tcx_follower import TCXFollower
+from .tcx_index import TCXIndex, TCXIndexedActivity
+from .tcx_spatial import TCXSpatialIndex
+from .tcx_extensions import TCXExtensionRegistry
 
-__all__ = [TCXReader, TCXTrackPoint, TCXAuthor, TCXExercise, TCXLap]
+__all__ = [TCXReader, TCXTrackPoint, TCXAuthor, TCXExercise, TCXLap, TCXReadStats, TCXStageStats, TCXFollower,
+           TCXIndex, TCXIndexedActivity, TCXSpatialIndex, TCXExtensionRegistry]
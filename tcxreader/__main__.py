@@ -0,0 +1,5 @@
+import sys
+
+from tcxreader.cli import main
+
+sys.exit(main())
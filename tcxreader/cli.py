@@ -0,0 +1,259 @@
+"""
+Command line batch converter/summarizer for TCX files.
+
+Example:
+    tcxreader activities/ '2025/**/*.tcx.gz' -o summaries.jsonl --jobs 8 --resume
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Set
+
+from tcxreader.tcx_exercise import TCXExercise
+from tcxreader.tcx_files import find_tcx_files
+from tcxreader.tcxreader import TCXReader
+
+SUMMARY_FIELDS = ['file'] + list(TCXExercise(laps=[], trackpoints=[]).summary_to_dict().keys())
+
+
+def _to_json_value(value):
+    """
+    Converts datetimes to ISO strings so that values can be written as JSON/CSV.
+    """
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _columns_filename(trackpoints_dir: str, file: str, base_dir: str = None) -> str:
+    """
+    Returns the path of the columnar trackpoint output for the given TCX file. The path of the file relative to
+    base_dir is mirrored in trackpoints_dir and the full file name is kept, so that e.g. a/x.tcx, b/x.tcx and
+    x.tcx.gz are written to different files.
+    """
+    if base_dir is None:
+        base_dir = os.path.dirname(os.path.abspath(file))
+    return os.path.join(trackpoints_dir, os.path.relpath(os.path.abspath(file), base_dir) + '.json')
+
+
+def process_file(file: str, only_gps: bool = True, null_value_handling: int = 1,
+                 fill_distance_from_gps: bool = False, trackpoints_dir: str = None,
+                 trackpoints_base_dir: str = None) -> dict:
+    """
+    Reads a single TCX file and returns its summary. Runs in a worker process.
+    :param file: Path to the TCX file.
+    :param only_gps: Passed to TCXReader.read.
+    :param null_value_handling: Passed to TCXReader.read.
+    :param fill_distance_from_gps: Passed to TCXReader.read.
+    :param trackpoints_dir: If set, the trackpoints are also written there as a JSON file of columns.
+    :param trackpoints_base_dir: Directory whose structure is mirrored in trackpoints_dir (default: the
+                                 directory of the file).
+    :return: Summary dictionary (keys of SUMMARY_FIELDS) with the file size under 'bytes'.
+    """
+    exercise = TCXReader().read(file, only_gps=only_gps, null_value_handling=null_value_handling,
+                                fill_distance_from_gps=fill_distance_from_gps)
+    if trackpoints_dir is not None:
+        columns = exercise.trackpoints_to_columns()
+        columns['time'] = [_to_json_value(value) for value in columns['time']]
+        columns_filename = _columns_filename(trackpoints_dir, file, trackpoints_base_dir)
+        os.makedirs(os.path.dirname(columns_filename), exist_ok=True)
+        with open(columns_filename, 'w', encoding='UTF-8') as columns_file:
+            json.dump(columns, columns_file)
+
+    summary = {'file': file}
+    for key, value in exercise.summary_to_dict().items():
+        summary[key] = _to_json_value(value)
+    summary['bytes'] = os.path.getsize(file)
+    return summary
+
+
+def _truncate_incomplete_record(output: str) -> None:
+    """
+    Removes an incomplete last record (everything after the last newline) left by an interrupted run, so that
+    resumed summaries start on a new line.
+    """
+    if not os.path.exists(output):
+        return
+    with open(output, 'rb+') as output_file:
+        output_file.seek(0, os.SEEK_END)
+        end = output_file.tell()
+        position = end
+        while position > 0:
+            block_start = max(0, position - (1 << 16))
+            output_file.seek(block_start)
+            newline = output_file.read(position - block_start).rfind(b'\n')
+            if newline != -1:
+                position = block_start + newline + 1
+                break
+            position = block_start
+        if position != end:
+            output_file.truncate(position)
+
+
+def _read_processed_files(output: str, output_format: str) -> Set[str]:
+    """
+    Returns the files already present in an existing output file (for --resume).
+    Incomplete records are ignored, so their files are processed again.
+    """
+    if not os.path.exists(output):
+        return set()
+    processed = set()
+    with open(output, encoding='UTF-8', newline='') as output_file:
+        if output_format == 'csv':
+            for row in csv.DictReader(output_file):
+                # a short row has None for the missing fields
+                if None not in row and None not in row.values():
+                    processed.add(os.path.abspath(row['file']))
+        else:
+            for line in output_file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    processed.add(os.path.abspath(json.loads(line)['file']))
+                except (ValueError, KeyError):
+                    continue
+    return processed
+
+
+class _SummaryWriter:
+    def __init__(self, output_file, output_format: str, write_header: bool):
+        """
+        Writes summaries as CSV rows or JSON lines. Nested values are JSON encoded in CSV.
+        """
+        self.output_file = output_file
+        self.output_format = output_format
+        if output_format == 'csv':
+            self.writer = csv.DictWriter(output_file, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+            if write_header:
+                self.writer.writeheader()
+
+    def write(self, summary: dict) -> None:
+        if self.output_format == 'csv':
+            self.writer.writerow({key: json.dumps(value) if isinstance(value, dict) else value
+                                  for key, value in summary.items()})
+        else:
+            summary = {key: value for key, value in summary.items() if key in SUMMARY_FIELDS}
+            self.output_file.write(json.dumps(summary) + '\n')
+        self.output_file.flush()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='tcxreader',
+                                     description='Parse TCX files in parallel and write per-file summaries.')
+    parser.add_argument('paths', nargs='+', help='TCX files (.tcx or .tcx.gz), directories or glob patterns.')
+    parser.add_argument('-o', '--output', help='Output file for summaries (default: standard output).')
+    parser.add_argument('-f', '--format', choices=('jsonl', 'csv'), default=None,
+                        help='Summary format (default: from the output extension, otherwise jsonl).')
+    parser.add_argument('-t', '--trackpoints-dir',
+                        help='Also write the trackpoints of every file as JSON columns into this directory.')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes (default: number of CPUs).')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip files already present in the output file and append to it.')
+    parser.add_argument('--all-points', action='store_true',
+                        help='Keep trackpoints without GPS data (only_gps=False).')
+    parser.add_argument('--interpolate', action='store_true', help='Linearly interpolate missing values.')
+    parser.add_argument('--fill-distance-from-gps', action='store_true',
+                        help='Compute missing distances from GPS data.')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Do not report progress.')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the tcxreader console command.
+    :param argv: Command line arguments (default: sys.argv[1:]).
+    :return: Exit code (1 if any file failed to parse).
+    """
+    args = build_parser().parse_args(argv)
+    output_format = args.format
+    if output_format is None:
+        output_format = 'csv' if args.output and args.output.lower().endswith('.csv') else 'jsonl'
+    if args.resume and not args.output:
+        print('tcxreader: --resume requires --output', file=sys.stderr)
+        return 2
+    if args.trackpoints_dir:
+        os.makedirs(args.trackpoints_dir, exist_ok=True)
+
+    # absolute paths, so that the same file given under another path spelling is processed (and resumed) once
+    files = sorted(set(os.path.abspath(file) for file in find_tcx_files(args.paths)))
+    # computed before skipping processed files, so that a resumed run writes to the same trackpoint paths
+    base_dir = os.path.commonpath([os.path.dirname(file) for file in files]) if files else None
+    skipped = 0
+    if args.resume:
+        _truncate_incomplete_record(args.output)
+        processed = _read_processed_files(args.output, output_format)
+        skipped = sum(1 for file in files if file in processed)
+        files = [file for file in files if file not in processed]
+
+    options = {
+        'only_gps': not args.all_points,
+        'null_value_handling': 2 if args.interpolate else 1,
+        'fill_distance_from_gps': args.fill_distance_from_gps,
+        'trackpoints_dir': args.trackpoints_dir,
+        'trackpoints_base_dir': base_dir,
+    }
+
+    if args.output:
+        append = args.resume and os.path.exists(args.output) and os.path.getsize(args.output) > 0
+        output_file = open(args.output, 'a' if append else 'w', encoding='UTF-8', newline='')
+    else:
+        append = False
+        output_file = sys.stdout
+    writer = _SummaryWriter(output_file, output_format, write_header=not append)
+
+    start = time.perf_counter()
+    done, failed, points, size = 0, 0, 0, 0
+
+    def report(summary: dict = None, file: str = None, error: Exception = None) -> None:
+        nonlocal done, failed, points, size
+        done += 1
+        if error is not None:
+            failed += 1
+            print(f'\ntcxreader: failed to parse {file}: {error}', file=sys.stderr)
+        else:
+            points += summary['trackpoints']
+            size += summary['bytes']
+            writer.write(summary)
+        if not args.quiet:
+            elapsed = time.perf_counter() - start
+            print(f'\r[{done}/{len(files)}] {done / elapsed:.1f} files/s, {points / elapsed:.0f} points/s',
+                  end='', file=sys.stderr, flush=True)
+
+    try:
+        if args.jobs <= 1:
+            for file in files:
+                try:
+                    report(process_file(file, **options))
+                except Exception as e:
+                    report(file=file, error=e)
+        else:
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                futures = {executor.submit(process_file, file, **options): file for file in files}
+                for future in as_completed(futures):
+                    try:
+                        report(future.result())
+                    except Exception as e:
+                        report(file=futures[future], error=e)
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    elapsed = time.perf_counter() - start
+    if not args.quiet and files:
+        print(file=sys.stderr)
+    print(f'Parsed {done - failed} files ({failed} failed, {skipped} skipped), {points} trackpoints, '
+          f'{size / 1e6:.1f} MB in {elapsed:.2f} s: '
+          f'{done / elapsed if elapsed else 0:.1f} files/s, {points / elapsed if elapsed else 0:.0f} points/s, '
+          f'{size / 1e6 / elapsed if elapsed else 0:.1f} MB/s', file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
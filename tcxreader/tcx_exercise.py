@@ -1,8 +1,9 @@
 from tcxreader.tcx_author import TCXAuthor
 from tcxreader.tcx_lap import TCXLap
+from tcxreader.tcx_simplify import simplify_trackpoints, downsample_trackpoints
 from tcxreader.tcx_track_point import TCXTrackPoint
 from datetime import datetime
-from typing import List
+from typing import List, Tuple
 
 
 class TCXExercise:
@@ -76,3 +77,81 @@ class TCXExercise:
                 
             
         return trackpoint_dict
+
+    def simplify_track(self, tolerance: float = 5.0) -> Tuple[List[float], List[float]]:
+        """
+        Simplify the GPS track with the Douglas-Peucker algorithm (e.g. for rendering on a map).
+        :param tolerance: Maximum allowed deviation from the original track in meters.
+        :return: Tuple of (latitudes, longitudes) of the simplified track.
+        """
+        return simplify_trackpoints(self.trackpoints, tolerance)
+
+    def downsample(self, attribute: str, threshold: int = 500) -> Tuple[List[float], List[float]]:
+        """
+        Downsample a time series with the Largest-Triangle-Three-Buckets algorithm (e.g. for rendering a chart).
+        :param attribute: Trackpoint attribute (e.g. hr_value, elevation) or TPX extension key (e.g. Speed).
+        :param threshold: Number of points to keep.
+        :return: Tuple of (seconds since start, values) of the downsampled series.
+        """
+        return downsample_trackpoints(self.trackpoints, attribute, threshold)
+
+    def summary_to_dict(self) -> dict:
+        """
+        Convert the exercise statistics (without trackpoints and laps) to a dictionary.
+        :return: A dictionary containing the exercise statistics.
+        """
+        return {
+            'activity_type': self.activity_type,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'duration': self.duration,
+            'distance': self.distance,
+            'calories': self.calories,
+            'hr_avg': self.hr_avg,
+            'hr_max': self.hr_max,
+            'hr_min': self.hr_min,
+            'max_speed': self.max_speed,
+            'avg_speed': self.avg_speed,
+            'cadence_avg': self.cadence_avg,
+            'cadence_max': self.cadence_max,
+            'ascent': self.ascent,
+            'descent': self.descent,
+            'altitude_avg': self.altitude_avg,
+            'altitude_min': self.altitude_min,
+            'altitude_max': self.altitude_max,
+            'author': self.author.name if self.author is not None else None,
+            'laps': len(self.laps) if self.laps is not None else 0,
+            'trackpoints': len(self.trackpoints) if self.trackpoints is not None else 0,
+            'tpx_ext_stats': self.tpx_ext_stats,
+            'lx_ext': self.lx_ext,
+        }
+
+    def trackpoints_to_columns(self) -> dict:
+        """
+        Convert trackpoints to a columnar dictionary (one list per trackpoint attribute and TPX extension key).
+        Missing values are None, so all lists have the same length. Other values of a TPX column all have the
+        type registered for the key (see TCXExtensionRegistry).
+        :return: A dictionary of columns.
+        """
+        columns = {key: [] for key in ('time', 'longitude', 'latitude', 'distance', 'elevation', 'hr_value',
+                                       'cadence')}
+        tpx_keys = []
+        for tp in self.trackpoints:
+            for key in tp.tpx_ext:
+                if key not in columns and key not in tpx_keys:
+                    tpx_keys.append(key)
+        for key in tpx_keys:
+            columns[key] = []
+
+        for tp in self.trackpoints:
+            columns['time'].append(tp.time)
+            columns['longitude'].append(tp.longitude)
+            columns['latitude'].append(tp.latitude)
+            columns['distance'].append(tp.distance)
+            columns['elevation'].append(tp.elevation)
+            columns['hr_value'].append(tp.hr_value)
+            columns['cadence'].append(tp.cadence)
+            for key in tpx_keys:
+                columns[key].append(tp.tpx_ext.get(key))
+
+        return columns
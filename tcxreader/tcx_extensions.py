@@ -0,0 +1,84 @@
+from functools import partial
+from typing import Callable, Dict, Tuple
+
+GARMIN_XML_EXTENSIONS = '{http://www.garmin.com/xmlschemas/ActivityExtension/v2}'
+
+# Types of the fields of Garmin's ActivityExtension/v2 schema (TPX for trackpoints, LX for laps)
+DEFAULT_EXTENSION_TYPES = {
+    # TPX
+    'Speed': float,
+    'Watts': int,
+    'RunCadence': int,
+    'CadenceSensor': str,
+    # LX
+    'AvgSpeed': float,
+    'MaxBikeCadence': int,
+    'AvgRunCadence': int,
+    'MaxRunCadence': int,
+    'Steps': int,
+    'AvgWatts': int,
+    'MaxWatts': int,
+}
+
+
+def _decode_int(text: str):
+    try:
+        return int(text)
+    except ValueError:
+        # e.g. "61.0"
+        return int(float(text))
+
+
+def _decode_str(text: str):
+    return text.strip()
+
+
+def _decode(convert: Callable, text: str):
+    try:
+        return convert(text)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+class TCXExtensionRegistry:
+    def __init__(self, types: Dict[str, type] = None, default_type: type = float):
+        """
+        Class holding the value type of every TPX/LX extension field, so that a field is always decoded to the
+        same type (e.g. Speed is always a float, even if a value is written as "3").
+        Values that cannot be decoded are stored as None.
+        :param types: Additional (or overriding) field types, e.g. {'Temperature': float}.
+        :param default_type: Type of fields that are not registered.
+        """
+        self.types: Dict[str, type] = dict(DEFAULT_EXTENSION_TYPES)
+        if types is not None:
+            self.types.update(types)
+        self.default_type: type = default_type
+        self.__decoders: Dict[str, Tuple[str, Callable]] = {}
+
+    def register(self, name: str, value_type: type) -> None:
+        """
+        Registers (or changes) the type of an extension field.
+        :param name: Name of the field without namespace, e.g. Watts.
+        :param value_type: int, float, str or any callable taking the text of the element.
+        :return: None
+        """
+        self.types[name] = value_type
+        self.__decoders.clear()
+
+    def decoder(self, tag: str) -> Tuple[str, Callable]:
+        """
+        Returns the field name and the decoding function of an extension element tag. Lookups are cached per tag.
+        :param tag: Tag of the element, e.g. {http://www.garmin.com/xmlschemas/ActivityExtension/v2}Speed.
+        :return: Tuple of (field name, function converting the element text to a value or None).
+        """
+        if tag not in self.__decoders:
+            name = tag.replace(GARMIN_XML_EXTENSIONS, "")
+            value_type = self.types.get(name, self.default_type)
+            if value_type is int:
+                convert = _decode_int
+            elif value_type is str:
+                convert = _decode_str
+            else:
+                convert = value_type
+            self.__decoders[tag] = (name, partial(_decode, convert))
+        return self.__decoders[tag]
@@ -0,0 +1,27 @@
+import glob
+import os
+from typing import Iterable, List
+
+TCX_EXTENSIONS = ('.tcx', '.tcx.gz')
+
+
+def find_tcx_files(paths: Iterable[str]) -> List[str]:
+    """
+    Expands files, directories (searched recursively) and glob patterns into a sorted list of TCX files.
+    :param paths: Files, directories or glob patterns.
+    :return: Sorted list of unique .tcx/.tcx.gz file paths.
+    """
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, filenames in os.walk(path):
+                for filename in filenames:
+                    if filename.lower().endswith(TCX_EXTENSIONS):
+                        files.add(os.path.join(directory, filename))
+        elif os.path.isfile(path):
+            files.add(path)
+        else:
+            for match in glob.glob(path, recursive=True):
+                if os.path.isfile(match) and match.lower().endswith(TCX_EXTENSIONS):
+                    files.add(match)
+    return sorted(files)
@@ -0,0 +1,351 @@
+import os
+import re
+import xml.etree.ElementTree as ET
+from typing import List, Tuple
+from xml.sax.saxutils import quoteattr
+
+from tcxreader.tcx_exercise import TCXExercise
+from tcxreader.tcx_extensions import TCXExtensionRegistry
+from tcxreader.tcx_lap import TCXLap
+from tcxreader.tcx_track_point import TCXTrackPoint
+from tcxreader.tcxreader import GARMIN_XML_SCHEMA, TCXReader
+
+# Number of bytes before the checkpoint that are compared at every poll to detect a rewritten file
+TAIL_SIZE = 256
+TRACKPOINT_END = re.compile(rb'</(?:[A-Za-z_][\w.-]*:)?Trackpoint\s*>')
+
+
+class _RunningStats:
+    def __init__(self):
+        """
+        Incrementally updated statistics of a sequence of trackpoints. apply() stores them in a TCXExercise or
+        TCXLap with the same semantics as the statistics calculated by TCXReader.read.
+        """
+        self.count = 0
+        self.hr_sum, self.hr_count, self.hr_min, self.hr_max = 0, 0, None, None
+        self.altitude_sum, self.altitude_count, self.altitude_min, self.altitude_max = 0.0, 0, None, None
+        self.cadence_sum, self.cadence_count, self.cadence_max = 0, 0, None
+        self.ascent, self.descent = 0.0, 0.0
+        self.previous_altitude = None
+        self.tpx_ext = {}
+        self.start_time, self.end_time = None, None
+        self.first_distance, self.last_distance = None, None
+        self.previous_tp = None
+        self.max_speed = 0.0
+
+    def add(self, tp: TCXTrackPoint) -> None:
+        self.count += 1
+        if tp.hr_value is not None:
+            self.hr_sum += tp.hr_value
+            self.hr_count += 1
+            self.hr_min = tp.hr_value if self.hr_min is None else min(self.hr_min, tp.hr_value)
+            self.hr_max = tp.hr_value if self.hr_max is None else max(self.hr_max, tp.hr_value)
+        if tp.elevation is not None:
+            self.altitude_sum += tp.elevation
+            self.altitude_count += 1
+            self.altitude_min = tp.elevation if self.altitude_min is None else min(self.altitude_min, tp.elevation)
+            self.altitude_max = tp.elevation if self.altitude_max is None else max(self.altitude_max, tp.elevation)
+            if self.previous_altitude is not None:
+                if tp.elevation > self.previous_altitude:
+                    self.ascent += tp.elevation - self.previous_altitude
+                elif tp.elevation < self.previous_altitude:
+                    self.descent += self.previous_altitude - tp.elevation
+            self.previous_altitude = tp.elevation
+        if tp.cadence is not None:
+            self.cadence_sum += tp.cadence
+            self.cadence_count += 1
+            self.cadence_max = tp.cadence if self.cadence_max is None else max(self.cadence_max, tp.cadence)
+        for key, value in tp.tpx_ext.items():
+            if value is not None and isinstance(value, (int, float)):
+                if key not in self.tpx_ext:
+                    self.tpx_ext[key] = [value, value, 0, 0]
+                key_stats = self.tpx_ext[key]
+                key_stats[0] = min(key_stats[0], value)
+                key_stats[1] = max(key_stats[1], value)
+                key_stats[2] += value
+                key_stats[3] += 1
+
+        if self.start_time is None:
+            self.start_time = tp.time
+        self.end_time = tp.time
+        if tp.distance is not None:
+            if self.first_distance is None:
+                self.first_distance = tp.distance
+            self.last_distance = tp.distance
+
+        previous_tp = self.previous_tp
+        if previous_tp is not None and previous_tp.time is not None and tp.time is not None \
+                and previous_tp.distance is not None and tp.distance is not None:
+            dt = abs((tp.time - previous_tp.time).total_seconds())
+            if dt != 0:
+                self.max_speed = max(self.max_speed, abs(tp.distance - previous_tp.distance) / dt * 3.6)
+        self.previous_tp = tp
+
+    def apply(self, tcx) -> None:
+        tcx.hr_avg = self.hr_sum / self.hr_count if self.hr_count else None
+        tcx.hr_min = self.hr_min
+        tcx.hr_max = self.hr_max
+        tcx.altitude_avg = self.altitude_sum / self.altitude_count if self.altitude_count else None
+        tcx.altitude_min = self.altitude_min
+        tcx.altitude_max = self.altitude_max
+        tcx.ascent = self.ascent
+        tcx.descent = self.descent
+        tcx.cadence_avg = self.cadence_sum / self.cadence_count if self.cadence_count else None
+        tcx.cadence_max = self.cadence_max
+        for key, (minimum, maximum, total, count) in self.tpx_ext.items():
+            tcx.tpx_ext_stats[key] = {"min": minimum, "max": maximum, "avg": total / count}
+
+        if self.count > 2:
+            tcx.start_time = self.start_time
+            tcx.end_time = self.end_time
+            tcx.duration = abs((tcx.start_time - tcx.end_time).total_seconds())
+            tcx.avg_speed = (tcx.distance / tcx.duration) * 3.6 if tcx.duration != 0 else 0.0
+            tcx.max_speed = self.max_speed
+        else:
+            tcx.start_time = None
+            tcx.end_time = None
+            tcx.duration = 0
+            tcx.avg_speed = 0.0
+            tcx.max_speed = 0.0
+
+
+class TCXFollower:
+    def __init__(self, fileLocation: str, only_gps: bool = True, extension_registry: TCXExtensionRegistry = None):
+        """
+        Class for incrementally reading a TCX file that is still being written (e.g. by an indoor trainer).
+        Every poll() reads only the bytes written since the previous poll and returns the newly completed
+        trackpoints and laps. The statistics of `exercise` are updated incrementally.
+        The follower keeps a checkpoint after the last completed trackpoint. Data after it (e.g. closing tags
+        that a writer overwrites on every save to keep the document valid) is parsed provisionally: if it
+        changes, its effects are undone and parsing resumes at the checkpoint. Only if the file changed before
+        the checkpoint (or cannot be parsed), it is read again from the start. Trackpoints and laps already
+        returned by previous polls are not returned again; a lap that was closed by overwritten closing tags
+        is returned once and updated in place.
+        :param fileLocation: Path to the (growing) TCX file.
+        :param only_gps: If True, trackpoints without GPS data are skipped.
+        :param extension_registry: Types of TPX/LX extension fields (see TCXReader).
+        """
+        self.file_location: str = fileLocation
+        self.only_gps: bool = only_gps
+        self.__reader = TCXReader(extension_registry)
+        self.exercise: TCXExercise = None
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forgets all parsed data and starts reading the file from the beginning at the next poll().
+        The `exercise` object is cleared in place, so references to it stay valid.
+        :return: None
+        """
+        self.offset: int = 0
+        exercise = TCXExercise(trackpoints=[], calories=0, distance=0, tpx_ext_stats={}, lx_ext={}, laps=[])
+        if self.exercise is None:
+            self.exercise = exercise
+        else:
+            vars(self.exercise).clear()
+            vars(self.exercise).update(vars(exercise))
+        self.__parser = ET.XMLPullParser(events=('start-ns', 'start', 'end'))
+        self.__exercise_stats = _RunningStats()
+        self.__lap = None
+        self.__lap_stats = None
+        self.__lap_children = []
+        self.__completed_laps_distance = 0.0
+
+        # checkpoint: offset after the last completed trackpoint, the bytes before it and the open elements
+        self.__checkpoint = 0
+        self.__fingerprint = b''
+        self.__checkpoint_stack = []
+        # bytes parsed after the checkpoint and the state before they were parsed
+        self.__tail = b''
+        self.__snapshot = None
+        self.__stack = []
+        self.__namespaces = {}
+
+    def poll(self) -> Tuple[List[TCXTrackPoint], List[TCXLap]]:
+        """
+        Reads the data written to the file since the previous poll.
+        :return: Tuple of (new trackpoints, newly completed laps).
+        """
+        returned_trackpoints = len(self.exercise.trackpoints)
+        returned_laps = len(self.exercise.laps)
+        try:
+            self.__read()
+        except ET.ParseError:
+            # the file was rewritten in a way the comparisons did not notice
+            self.reset()
+            self.__read()
+        return self.exercise.trackpoints[returned_trackpoints:], self.exercise.laps[returned_laps:]
+
+    def __read(self) -> None:
+        """
+        Parses the bytes after the checkpoint that were not parsed yet.
+        :return: None
+        """
+        with open(self.file_location, 'rb') as tcx_file:
+            size = tcx_file.seek(0, os.SEEK_END)
+            tcx_file.seek(self.__checkpoint - len(self.__fingerprint))
+            rewritten = size < self.__checkpoint or tcx_file.read(len(self.__fingerprint)) != self.__fingerprint
+            data = tcx_file.read()
+        if rewritten:
+            self.reset()
+            with open(self.file_location, 'rb') as tcx_file:
+                data = tcx_file.read()
+
+        if data.startswith(self.__tail):
+            data = data[len(self.__tail):]
+        else:
+            # the data after the last completed trackpoint was overwritten (e.g. the closing tags)
+            self.__rollback()
+            self.__resume()
+        self.__parse(data)
+
+    def __parse(self, data: bytes) -> None:
+        """
+        Parses bytes following the already parsed ones and moves the checkpoint after the last completed trackpoint.
+        :param data: The new bytes.
+        :return: None
+        """
+        self.__parser.feed(data)
+        for event, item in self.__parser.read_events():
+            if event == 'start-ns':
+                self.__namespaces.setdefault(*item)
+            elif event == 'start':
+                self.__stack.append(item)
+                if item.tag == GARMIN_XML_SCHEMA + 'Activity':
+                    self.__take_snapshot()
+                    self.exercise.activity_type = item.attrib.get('Sport')
+                elif item.tag == GARMIN_XML_SCHEMA + 'Lap':
+                    self.__take_snapshot()
+                    self.__lap = TCXLap(calories=0, distance=0, trackpoints=[], tpx_ext_stats={}, lx_ext={})
+                    self.__lap_stats = _RunningStats()
+                    self.__lap_children = []
+            else:
+                self.__stack.pop()
+                parent = self.__stack[-1] if self.__stack else None
+                if item.tag == GARMIN_XML_SCHEMA + 'Trackpoint':
+                    self.__add_trackpoint(item)
+                    if parent is not None and len(parent) and parent[-1] is item:
+                        del parent[-1]
+                    # everything parsed so far is final
+                    self.__snapshot = None
+                    self.__checkpoint_stack = list(self.__stack)
+                elif item.tag == GARMIN_XML_SCHEMA + 'Lap' and self.__lap is not None:
+                    self.__take_snapshot()
+                    self.__finish_lap()
+                elif parent is not None and parent.tag == GARMIN_XML_SCHEMA + 'Lap' \
+                        and item.tag != GARMIN_XML_SCHEMA + 'Track':
+                    # lap summary (calories, distance, extensions), used when the lap is finished
+                    self.__take_snapshot()
+                    self.__lap_children.append(item)
+                elif item.tag == GARMIN_XML_SCHEMA + 'Author':
+                    self.__take_snapshot()
+                    self.exercise.author = self.__reader.author_parser(item)
+
+        tail = self.__tail + data
+        last_end = None
+        for last_end in TRACKPOINT_END.finditer(tail):
+            pass
+        if last_end is not None:
+            self.__checkpoint += last_end.end()
+            self.__fingerprint = (self.__fingerprint + tail[:last_end.end()])[-TAIL_SIZE:]
+            tail = tail[last_end.end():]
+        self.__tail = tail
+        self.offset = self.__checkpoint + len(self.__tail)
+        self.__update_exercise()
+
+    def __add_trackpoint(self, element: ET.Element) -> None:
+        tcx_point = TCXTrackPoint(tpx_ext={})
+        self.__reader.trackpoint_parser(tcx_point, element)
+        element.clear()
+        if self.__lap is None or (self.only_gps and tcx_point.longitude is None):
+            return
+        self.__lap.trackpoints.append(tcx_point)
+        self.__lap_stats.add(tcx_point)
+        self.exercise.trackpoints.append(tcx_point)
+        self.__exercise_stats.add(tcx_point)
+
+    def __take_snapshot(self) -> None:
+        """
+        Stores the state at the checkpoint before the first change after it, so that the change can be undone.
+        :return: None
+        """
+        if self.__snapshot is None:
+            self.__snapshot = (self.exercise.activity_type, self.exercise.author, self.exercise.calories,
+                               dict(self.exercise.lx_ext), len(self.exercise.laps), self.__completed_laps_distance,
+                               self.__lap, self.__lap_stats, self.__lap_children, len(self.__lap_children))
+
+    def __rollback(self) -> None:
+        """
+        Undoes the changes made by the data after the checkpoint.
+        :return: None
+        """
+        if self.__snapshot is None:
+            return
+        (self.exercise.activity_type, self.exercise.author, self.exercise.calories, self.exercise.lx_ext, laps,
+         self.__completed_laps_distance, self.__lap, self.__lap_stats, self.__lap_children,
+         lap_children) = self.__snapshot
+        del self.exercise.laps[laps:]
+        del self.__lap_children[lap_children:]
+        self.__snapshot = None
+
+    def __resume(self) -> None:
+        """
+        Creates a new parser positioned at the checkpoint by feeding it the start tags of the elements that are open
+        there (e.g. <TrainingCenterDatabase><Activities><Activity><Lap><Track>).
+        :return: None
+        """
+        prefixes = {uri: prefix for prefix, uri in self.__namespaces.items()}
+        start_tags = []
+        for element in self.__checkpoint_stack:
+            uri, local = element.tag[1:].split('}', 1) if element.tag.startswith('{') else ('', element.tag)
+            if uri not in prefixes:
+                prefixes[uri] = f'ns{len(prefixes)}'
+            name = f'{prefixes[uri]}:{local}' if prefixes[uri] else local
+            attributes = ''.join(f' {key}={quoteattr(value)}' for key, value in element.attrib.items() if '{' not in key)
+            start_tags.append((name, attributes))
+        if start_tags:
+            declarations = ''.join(f' xmlns:{prefix}={quoteattr(uri)}' if prefix else f' xmlns={quoteattr(uri)}'
+                                   for uri, prefix in prefixes.items() if uri)
+            start_tags[0] = (start_tags[0][0], start_tags[0][1] + declarations)
+
+        self.__parser = ET.XMLPullParser(events=('start-ns', 'start', 'end'))
+        self.__parser.feed(''.join(f'<{name}{attributes}>' for name, attributes in start_tags).encode('UTF-8'))
+        self.__stack = [element for event, element in self.__parser.read_events() if event == 'start']
+        self.__tail = b''
+
+    def __finish_lap(self) -> None:
+        """
+        Reads the lap summary (calories, distance, extensions) of a completed <Lap> and calculates its statistics.
+        Laps without trackpoints are not added to the exercise.
+        :return: None
+        """
+        tcx_lap = self.__lap
+        tcx_lap.calories = 0
+        tcx_lap.distance = 0
+        for lap_child in self.__lap_children:
+            if lap_child.tag == GARMIN_XML_SCHEMA + 'Calories':
+                tcx_lap.calories += int(round(float(lap_child.text)))
+            elif lap_child.tag == GARMIN_XML_SCHEMA + 'DistanceMeters':
+                tcx_lap.distance += float(lap_child.text)
+            elif lap_child.tag == GARMIN_XML_SCHEMA + 'Extensions':
+                self.__reader.lap_extensions_parser(tcx_lap, self.exercise, lap_child)
+
+        self.exercise.calories += tcx_lap.calories
+        self.__completed_laps_distance += tcx_lap.distance
+        self.__lap_stats.apply(tcx_lap)
+        self.__lap = None
+        self.__lap_stats = None
+
+        if len(tcx_lap.trackpoints) > 0:
+            self.exercise.laps.append(tcx_lap)
+
+    def __update_exercise(self) -> None:
+        """
+        Updates the exercise statistics. The distance of the lap in progress is estimated from its trackpoints.
+        :return: None
+        """
+        distance = self.__completed_laps_distance
+        if self.__lap_stats is not None and self.__lap_stats.first_distance is not None:
+            distance += self.__lap_stats.last_distance - self.__lap_stats.first_distance
+        self.exercise.distance = distance
+        self.__exercise_stats.apply(self.exercise)
@@ -0,0 +1,184 @@
+import math
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+EARTH_RADIUS = 6371008.8  # mean earth radius in meters
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two points on a sphere.
+    :return: Distance in meters.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def vincenty(lat1: float, lon1: float, lat2: float, lon2: float, max_iterations: int = 200,
+             tolerance: float = 1e-12) -> float:
+    """
+    Distance between two points on the WGS-84 ellipsoid (Vincenty's inverse formula).
+    Falls back to haversine for nearly antipodal points where the iteration does not converge.
+    :return: Distance in meters.
+    """
+    if lat1 == lat2 and lon1 == lon2:
+        return 0.0
+
+    u1 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat1)))
+    u2 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat2)))
+    sin_u1, cos_u1 = math.sin(u1), math.cos(u1)
+    sin_u2, cos_u2 = math.sin(u2), math.cos(u2)
+    big_l = math.radians(lon2 - lon1)
+    lam = big_l
+
+    for _ in range(max_iterations):
+        sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+        sin_sigma = math.sqrt((cos_u2 * sin_lam) ** 2 + (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam) ** 2)
+        if sin_sigma == 0:
+            return 0.0
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+        sigma = math.atan2(sin_sigma, cos_sigma)
+        sin_alpha = cos_u1 * cos_u2 * sin_lam / sin_sigma
+        cos_sq_alpha = 1 - sin_alpha ** 2
+        cos_2sigma_m = cos_sigma - 2 * sin_u1 * sin_u2 / cos_sq_alpha if cos_sq_alpha != 0 else 0.0
+        c = WGS84_F / 16 * cos_sq_alpha * (4 + WGS84_F * (4 - 3 * cos_sq_alpha))
+        lam_previous = lam
+        lam = big_l + (1 - c) * WGS84_F * sin_alpha * (
+            sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)))
+        if abs(lam - lam_previous) < tolerance:
+            break
+    else:
+        return haversine(lat1, lon1, lat2, lon2)
+
+    u_sq = cos_sq_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (cos_2sigma_m + big_b / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sigma_m ** 2) - big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (
+            -3 + 4 * cos_2sigma_m ** 2)))
+    return WGS84_B * big_a * (sigma - delta_sigma)
+
+
+DISTANCE_METHODS = {
+    'haversine': haversine,
+    'vincenty': vincenty,
+}
+
+
+def segment_distances(latitudes: Sequence[Optional[float]], longitudes: Sequence[Optional[float]],
+                      method: str = 'haversine') -> List[Optional[float]]:
+    """
+    Distances between consecutive points. The first element is always 0.0.
+    A segment touching a point without GPS data is None.
+    :param latitudes: Latitudes in degrees.
+    :param longitudes: Longitudes in degrees.
+    :param method: 'haversine' or 'vincenty'.
+    :return: List of segment distances in meters (same length as the input).
+    """
+    if method not in DISTANCE_METHODS:
+        raise ValueError(f'Unknown distance method {method!r}')
+    distance = DISTANCE_METHODS[method]
+    if len(latitudes) == 0:
+        return []
+
+    return [0.0] + [
+        distance(lat1, lon1, lat2, lon2)
+        if lat1 is not None and lon1 is not None and lat2 is not None and lon2 is not None else None
+        for lat1, lon1, lat2, lon2 in zip(latitudes, longitudes, latitudes[1:], longitudes[1:])
+    ]
+
+
+def cumulative_distance(segments: Sequence[Optional[float]]) -> List[float]:
+    """
+    Running sum of segment distances. Missing segments (None) add no distance.
+    :param segments: Segment distances as returned by segment_distances.
+    :return: List of cumulative distances in meters.
+    """
+    total = 0.0
+    result = []
+    for segment in segments:
+        if segment is not None:
+            total += segment
+        result.append(total)
+    return result
+
+
+def speeds(distances: Sequence[Optional[float]], times: Sequence[Optional[datetime]]) -> List[Optional[float]]:
+    """
+    Instantaneous speed between consecutive points. The first element is always 0.0.
+    A speed is None when the time or distance at either end is missing or when no time elapsed.
+    :param distances: Cumulative distances in meters.
+    :param times: Datetimes of the points.
+    :return: List of speeds in m/s.
+    """
+    if len(distances) == 0:
+        return []
+
+    def speed(d1, d2, t1, t2):
+        if d1 is None or d2 is None or t1 is None or t2 is None:
+            return None
+        dt = abs((t2 - t1).total_seconds())
+        return abs(d2 - d1) / dt if dt != 0 else None
+
+    return [0.0] + [speed(d1, d2, t1, t2) for d1, d2, t1, t2 in zip(distances, distances[1:], times, times[1:])]
+
+
+def grades(distances: Sequence[Optional[float]], elevations: Sequence[Optional[float]],
+           min_distance: float = 1.0) -> List[Optional[float]]:
+    """
+    Grade (slope) between consecutive points. The first element is always 0.0.
+    A grade is None when data is missing or the points are closer than min_distance.
+    :param distances: Cumulative distances in meters.
+    :param elevations: Elevations in meters.
+    :param min_distance: Minimal horizontal distance in meters for the grade to be computed.
+    :return: List of grades in percent.
+    """
+    if len(distances) == 0:
+        return []
+
+    def grade(d1, d2, e1, e2):
+        if d1 is None or d2 is None or e1 is None or e2 is None:
+            return None
+        run = d2 - d1
+        return (e2 - e1) / run * 100 if abs(run) >= min_distance else None
+
+    return [0.0] + [grade(d1, d2, e1, e2) for d1, d2, e1, e2 in zip(distances, distances[1:], elevations,
+                                                                     elevations[1:])]
+
+
+def filter_spikes(values: Sequence[Optional[float]], window: int = 5, threshold: float = 3.0,
+                  max_value: float = None) -> List[Optional[float]]:
+    """
+    Replaces outlier spikes (e.g. GPS jumps) with the median of the surrounding window.
+    A value is a spike if it is larger than max_value or deviates from the local median by more than
+    threshold times the median absolute deviation of the window (at least 5 % of the median).
+    :param values: Values to filter (None values are kept and ignored).
+    :param window: Number of values in the sliding window (centered on the value).
+    :param threshold: Allowed deviation in multiples of the median absolute deviation.
+    :param max_value: Values above this are always treated as spikes.
+    :return: Filtered list of values.
+    """
+    def median(data):
+        data = sorted(data)
+        middle = len(data) // 2
+        return data[middle] if len(data) % 2 else (data[middle - 1] + data[middle]) / 2
+
+    half = window // 2
+    result = list(values)
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        neighbours = [v for v in values[max(0, i - half):i + half + 1] if v is not None]
+        local_median = median(neighbours)
+        # floor the spread so that a single spike in an otherwise constant window is still detected
+        spread = max(median([abs(v - local_median) for v in neighbours]), 0.05 * abs(local_median))
+        if (max_value is not None and value > max_value) or abs(value - local_median) > threshold * spread:
+            result[i] = local_median if max_value is None or local_median <= max_value else None
+    return result
@@ -0,0 +1,318 @@
+import datetime
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tcxreader.tcx_exercise import TCXExercise
+from tcxreader.tcx_files import find_tcx_files
+from tcxreader.tcxreader import TCXReader
+
+STAT_COLUMNS = ['start_time', 'end_time', 'duration', 'distance', 'calories', 'hr_avg', 'hr_max', 'hr_min',
+                'max_speed', 'avg_speed', 'cadence_avg', 'cadence_max', 'ascent', 'descent', 'altitude_avg',
+                'altitude_min', 'altitude_max']
+ACTIVITY_COLUMNS = ['file', 'mtime', 'size', 'sha1', 'activity_type'] + STAT_COLUMNS + [
+    'author', 'laps', 'trackpoints', 'min_latitude', 'min_longitude', 'max_latitude', 'max_longitude']
+LAP_COLUMNS = ['file', 'lap'] + STAT_COLUMNS
+FAILURE_COLUMNS = ['file', 'mtime', 'size', 'sha1', 'error']
+# Number of parsed files stored per transaction
+COMMIT_INTERVAL = 50
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS activities (
+    {', '.join(ACTIVITY_COLUMNS)},
+    PRIMARY KEY (file)
+);
+CREATE TABLE IF NOT EXISTS laps (
+    {', '.join(LAP_COLUMNS)},
+    PRIMARY KEY (file, lap)
+);
+CREATE TABLE IF NOT EXISTS failures (
+    {', '.join(FAILURE_COLUMNS)},
+    PRIMARY KEY (file)
+);
+CREATE INDEX IF NOT EXISTS activities_start_time ON activities (start_time);
+CREATE INDEX IF NOT EXISTS activities_activity_type ON activities (activity_type, start_time);
+"""
+
+
+def _to_sql_value(value):
+    """
+    Stores datetimes as ISO strings (timezone aware values are converted to UTC) so they sort correctly.
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return value.isoformat()
+    return value
+
+
+def _from_sql_value(column: str, value):
+    if value is not None and column in ('start_time', 'end_time'):
+        pattern = '%Y-%m-%dT%H:%M:%S.%f' if '.' in value else '%Y-%m-%dT%H:%M:%S'
+        return datetime.datetime.strptime(value, pattern)
+    return value
+
+
+def _file_sha1(file: str) -> str:
+    sha1 = hashlib.sha1()
+    with open(file, 'rb') as tcx_file:
+        for block in iter(lambda: tcx_file.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def _summarize(file: str) -> Tuple[dict, List[dict]]:
+    """
+    Reads a TCX file and returns its activity row and lap rows. Runs in a worker process.
+    """
+    exercise: TCXExercise = TCXReader().read(file)
+    activity = {column: _to_sql_value(getattr(exercise, column)) for column in STAT_COLUMNS}
+    activity['file'] = file
+    activity['activity_type'] = exercise.activity_type
+    activity['author'] = exercise.author.name if exercise.author is not None else None
+    activity['laps'] = len(exercise.laps)
+    activity['trackpoints'] = len(exercise.trackpoints)
+
+    latitudes = [tp.latitude for tp in exercise.trackpoints if tp.latitude is not None]
+    longitudes = [tp.longitude for tp in exercise.trackpoints if tp.longitude is not None]
+    activity['min_latitude'] = min(latitudes) if latitudes else None
+    activity['max_latitude'] = max(latitudes) if latitudes else None
+    activity['min_longitude'] = min(longitudes) if longitudes else None
+    activity['max_longitude'] = max(longitudes) if longitudes else None
+
+    laps = []
+    for index, lap in enumerate(exercise.laps):
+        lap_row = {column: _to_sql_value(getattr(lap, column)) for column in STAT_COLUMNS}
+        lap_row['file'] = file
+        lap_row['lap'] = index
+        laps.append(lap_row)
+    return activity, laps
+
+
+def _safe_summarize(file: str) -> Tuple[Optional[Tuple[dict, List[dict]]], Optional[str]]:
+    """
+    Like _summarize, but also catches the errors of files that cannot be parsed.
+    :return: Tuple of (result of _summarize or None, error message or None).
+    """
+    try:
+        return _summarize(file), None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
+
+
+class TCXIndexedActivity:
+    def __init__(self, **columns):
+        """
+        Summary of an indexed activity (one row of the index). Has an attribute for every column of the
+        activities table (file, activity_type, start_time, distance, hr_avg, min_latitude, ...).
+        The full activity is only parsed when read() is called.
+        """
+        self.file: str = None
+        for column, value in columns.items():
+            setattr(self, column, _from_sql_value(column, value))
+
+    def read(self, **kwargs) -> TCXExercise:
+        """
+        Reads the full activity with TCXReader.read.
+        :param kwargs: Passed to TCXReader.read.
+        :return: A TCXExercise object.
+        """
+        return TCXReader().read(self.file, **kwargs)
+
+
+class TCXIndex:
+    def __init__(self, database: str):
+        """
+        Class for indexing TCXExercise summaries of many TCX files in a local SQLite database.
+        :param database: Path to the SQLite database (created if it does not exist).
+        """
+        self.database: str = database
+        self.connection = sqlite3.connect(database)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def update(self, paths: Iterable[str], jobs: int = 1, remove_missing: bool = False) -> dict:
+        """
+        Adds new and changed TCX files to the index. A file is only parsed again if its modification time or
+        size changed and its content hash differs from the indexed one.
+        Files that cannot be parsed are recorded with their error (see failures()) and are not parsed again
+        until they change. If a changed file cannot be parsed anymore, its activity is removed from the index.
+        :param paths: TCX files, directories (searched recursively) or glob patterns.
+        :param jobs: Number of worker processes used for parsing.
+        :param remove_missing: If True, indexed files that no longer exist are removed from the index.
+        :return: Dictionary with the number of 'added', 'updated', 'unchanged', 'removed' and 'failed' files
+                 ('failed' includes unchanged files that failed before).
+        """
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+        indexed = {row[0]: row[1:] for row in self.connection.execute('SELECT file, mtime, size, sha1 FROM activities')}
+        failed = {row[0]: row[1:] for row in self.connection.execute('SELECT file, mtime, size, sha1 FROM failures')}
+
+        to_parse = []
+        for file in find_tcx_files(paths):
+            file = os.path.abspath(file)
+            stat = os.stat(file)
+            if file in indexed or file in failed:
+                table, count = ('activities', 'unchanged') if file in indexed else ('failures', 'failed')
+                mtime, size, sha1 = indexed[file] if file in indexed else failed[file]
+                if mtime == stat.st_mtime and size == stat.st_size:
+                    counts[count] += 1
+                    continue
+                file_sha1 = _file_sha1(file)
+                if file_sha1 == sha1:
+                    self.connection.execute(f'UPDATE {table} SET mtime = ?, size = ? WHERE file = ?',
+                                            (stat.st_mtime, stat.st_size, file))
+                    counts[count] += 1
+                    continue
+            else:
+                file_sha1 = _file_sha1(file)
+            to_parse.append((file, stat.st_mtime, stat.st_size, file_sha1))
+
+        self.connection.commit()
+
+        files = [file for file, _, _, _ in to_parse]
+        futures = []
+        if jobs > 1 and len(files) > 1:
+            executor = ProcessPoolExecutor(max_workers=jobs)
+            futures = [executor.submit(_safe_summarize, file) for file in files]
+            results = (future.result() for future in futures)
+        else:
+            executor = None
+            results = map(_safe_summarize, files)
+
+        try:
+            # results are stored as they arrive and committed in batches, so an interrupted update keeps its progress
+            for parsed, ((file, mtime, size, sha1), (result, error)) in enumerate(zip(to_parse, results), 1):
+                if result is None:
+                    # an outdated activity of a file that cannot be parsed anymore must not be returned by query()
+                    self.__delete(file)
+                    self.connection.execute(
+                        f'INSERT INTO failures ({", ".join(FAILURE_COLUMNS)}) VALUES (?, ?, ?, ?, ?)',
+                        (file, mtime, size, sha1, error))
+                    counts['failed'] += 1
+                else:
+                    activity, laps = result
+                    activity.update({'mtime': mtime, 'size': size, 'sha1': sha1})
+                    counts['updated' if file in indexed else 'added'] += 1
+                    self.__store(activity, laps)
+                if parsed % COMMIT_INTERVAL == 0:
+                    self.connection.commit()
+            self.connection.commit()
+        finally:
+            if executor is not None:
+                for future in futures:
+                    future.cancel()
+                executor.shutdown()
+
+        if remove_missing:
+            for file in set(indexed).union(failed):
+                if not os.path.exists(file):
+                    self.__delete(file)
+                    if file in indexed:
+                        counts['removed'] += 1
+
+        self.connection.commit()
+        return counts
+
+    def __delete(self, file: str) -> None:
+        for table in ('laps', 'activities', 'failures'):
+            self.connection.execute(f'DELETE FROM {table} WHERE file = ?', (file,))
+
+    def __store(self, activity: dict, laps: List[dict]) -> None:
+        self.__delete(activity['file'])
+        self.connection.execute(
+            f'INSERT OR REPLACE INTO activities ({", ".join(ACTIVITY_COLUMNS)}) '
+            f'VALUES ({", ".join("?" * len(ACTIVITY_COLUMNS))})',
+            [activity[column] for column in ACTIVITY_COLUMNS])
+        self.connection.executemany(
+            f'INSERT INTO laps ({", ".join(LAP_COLUMNS)}) VALUES ({", ".join("?" * len(LAP_COLUMNS))})',
+            [[lap[column] for column in LAP_COLUMNS] for lap in laps])
+
+    def query(self, activity_type: str = None, start_after: datetime.datetime = None,
+              start_before: datetime.datetime = None, min_distance: float = None, max_distance: float = None,
+              min_hr_avg: float = None, max_hr_avg: float = None, author: str = None,
+              bbox: Tuple[float, float, float, float] = None, where: str = None, params: Iterable = (),
+              order_by: str = 'start_time') -> List[TCXIndexedActivity]:
+        """
+        Finds indexed activities. All given filters must match.
+        Example: all rides over 100 km with average HR above 140 in 2025:
+            index.query(activity_type='Biking', min_distance=100000, min_hr_avg=140,
+                        start_after=datetime(2025, 1, 1), start_before=datetime(2026, 1, 1))
+        :param activity_type: Sport string e.g. Biking.
+        :param start_after: Only activities starting at or after this datetime (timezone aware values as UTC).
+        :param start_before: Only activities starting before this datetime.
+        :param min_distance: Minimum distance in meters.
+        :param max_distance: Maximum distance in meters.
+        :param min_hr_avg: Minimum average heart rate.
+        :param max_hr_avg: Maximum average heart rate.
+        :param author: Name of the author (device).
+        :param bbox: (min_latitude, min_longitude, max_latitude, max_longitude); activities whose bounding box
+                     intersects it.
+        :param where: Additional SQL condition on the activities table.
+        :param params: Parameters of the additional SQL condition.
+        :param order_by: Column to sort by.
+        :return: List of TCXIndexedActivity objects.
+        """
+        conditions = []
+        values = []
+        for column, operator, value in (
+                ('activity_type', '=', activity_type),
+                ('start_time', '>=', _to_sql_value(start_after)),
+                ('start_time', '<', _to_sql_value(start_before)),
+                ('distance', '>=', min_distance),
+                ('distance', '<=', max_distance),
+                ('hr_avg', '>=', min_hr_avg),
+                ('hr_avg', '<=', max_hr_avg),
+                ('author', '=', author),
+        ):
+            if value is not None:
+                conditions.append(f'{column} {operator} ?')
+                values.append(value)
+        if bbox is not None:
+            min_latitude, min_longitude, max_latitude, max_longitude = bbox
+            conditions.append('max_latitude >= ? AND min_latitude <= ? AND max_longitude >= ? AND min_longitude <= ?')
+            values.extend([min_latitude, max_latitude, min_longitude, max_longitude])
+        if where:
+            conditions.append(f'({where})')
+            values.extend(params)
+        if order_by not in ACTIVITY_COLUMNS:
+            raise ValueError(f'Cannot order by {order_by!r}')
+
+        sql = f'SELECT {", ".join(ACTIVITY_COLUMNS)} FROM activities'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += f' ORDER BY {order_by}'
+        return [TCXIndexedActivity(**dict(zip(ACTIVITY_COLUMNS, row))) for row in self.connection.execute(sql, values)]
+
+    def get(self, file: str) -> Optional[TCXIndexedActivity]:
+        """
+        Returns the indexed activity of the given file (None if it is not indexed).
+        """
+        activities = self.query(where='file = ?', params=(os.path.abspath(file),))
+        return activities[0] if activities else None
+
+    def failures(self) -> Dict[str, str]:
+        """
+        Returns the files that could not be parsed.
+        :return: Dictionary of file -> error message.
+        """
+        return dict(self.connection.execute('SELECT file, error FROM failures ORDER BY file'))
+
+    def laps(self, file: str) -> List[dict]:
+        """
+        Returns the indexed lap summaries of the given file.
+        :param file: Path to the TCX file.
+        :return: List of dictionaries (one per lap, in order).
+        """
+        rows = self.connection.execute(f'SELECT {", ".join(LAP_COLUMNS)} FROM laps WHERE file = ? ORDER BY lap',
+                                       (os.path.abspath(file),))
+        return [{column: _from_sql_value(column, value) for column, value in zip(LAP_COLUMNS, row)} for row in rows]
@@ -1,6 +1,7 @@
+from tcxreader.tcx_simplify import simplify_trackpoints, downsample_trackpoints
 from tcxreader.tcx_track_point import TCXTrackPoint
 from datetime import datetime
-from typing import List
+from typing import List, Tuple
 
 
 class TCXLap:
@@ -59,3 +60,20 @@ class TCXLap:
         self.lx_ext: dict = lx_ext
         if self.lx_ext == None:
             self.lx_ext: dict = {}
+
+    def simplify_track(self, tolerance: float = 5.0) -> Tuple[List[float], List[float]]:
+        """
+        Simplify the GPS track with the Douglas-Peucker algorithm (e.g. for rendering on a map).
+        :param tolerance: Maximum allowed deviation from the original track in meters.
+        :return: Tuple of (latitudes, longitudes) of the simplified track.
+        """
+        return simplify_trackpoints(self.trackpoints, tolerance)
+
+    def downsample(self, attribute: str, threshold: int = 500) -> Tuple[List[float], List[float]]:
+        """
+        Downsample a time series with the Largest-Triangle-Three-Buckets algorithm (e.g. for rendering a chart).
+        :param attribute: Trackpoint attribute (e.g. hr_value, elevation) or TPX extension key (e.g. Speed).
+        :param threshold: Number of points to keep.
+        :return: Tuple of (seconds since start, values) of the downsampled series.
+        """
+        return downsample_trackpoints(self.trackpoints, attribute, threshold)
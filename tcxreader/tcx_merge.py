@@ -0,0 +1,167 @@
+import heapq
+from typing import Dict, List, Optional
+
+from tcxreader.tcx_exercise import TCXExercise
+from tcxreader.tcx_geo import cumulative_distance, segment_distances
+from tcxreader.tcx_lap import TCXLap
+from tcxreader.tcx_track_point import TCXTrackPoint
+from tcxreader.tcxreader import TCXReader
+
+TRACKPOINT_FIELDS = ('position', 'elevation', 'distance', 'hr_value', 'cadence')
+
+
+def _merge_group(group: Dict[int, TCXTrackPoint], order: List[int], priorities: Dict[str, List[int]],
+                 distance_source: Optional[int]) -> TCXTrackPoint:
+    """
+    Merges trackpoints of different sources recorded at (about) the same time into one trackpoint.
+    :param group: Source index -> trackpoint.
+    :param order: Default priority of the sources.
+    :param priorities: Field -> priority of the sources.
+    :param distance_source: Source of the cumulative distance. Distances of different devices have a different
+                            origin and scale, so they are never mixed.
+    :return: The merged TCXTrackPoint.
+    """
+    def pick(field, get):
+        for source in priorities.get(field, order):
+            tp = group.get(source)
+            if tp is not None:
+                value = get(tp)
+                if value is not None:
+                    return value
+        return None
+
+    merged = TCXTrackPoint(tpx_ext={})
+    merged.time = group[next(source for source in order if source in group)].time
+    position = pick('position', lambda tp: (tp.latitude, tp.longitude) if tp.longitude is not None else None)
+    if position is not None:
+        merged.latitude, merged.longitude = position
+    merged.elevation = pick('elevation', lambda tp: tp.elevation)
+    merged.distance = group[distance_source].distance if distance_source in group else None
+    merged.hr_value = pick('hr_value', lambda tp: tp.hr_value)
+    merged.cadence = pick('cadence', lambda tp: tp.cadence)
+
+    tpx_keys = []
+    for tp in group.values():
+        for key in tp.tpx_ext:
+            if key not in tpx_keys:
+                tpx_keys.append(key)
+    for key in tpx_keys:
+        value = pick(key if key in priorities else 'tpx_ext', lambda tp: tp.tpx_ext.get(key))
+        if value is not None:
+            merged.tpx_ext[key] = value
+    return merged
+
+
+def _continue_distance(trackpoints: List[TCXTrackPoint]) -> None:
+    """
+    Fills the distance of merged trackpoints the distance source has no trackpoint or value for with the GPS
+    distance, offset by the last recorded distance (as TCXReader.read(fill_distance_from_gps=True)). If the distance
+    source starts later than the merged exercise, its distances are shifted to continue the GPS distance of the
+    leading trackpoints.
+    :param trackpoints: Merged trackpoints (modified in-place).
+    :return: None
+    """
+    first = next((i for i, tp in enumerate(trackpoints) if tp.distance is not None), None)
+    if first is None:
+        return
+    gps_distances = cumulative_distance(segment_distances([tp.latitude for tp in trackpoints],
+                                                          [tp.longitude for tp in trackpoints]))
+    shift = gps_distances[first] - trackpoints[first].distance if first > 0 else 0.0
+    offset = 0.0
+    for tp, gps_distance in zip(trackpoints, gps_distances):
+        if tp.distance is None:
+            tp.distance = gps_distance + offset
+        else:
+            tp.distance += shift
+            offset = tp.distance - gps_distance
+
+
+def _covered_seconds(exercise: TCXExercise) -> float:
+    times = [tp.time for tp in exercise.trackpoints if tp.time is not None]
+    return (times[-1] - times[0]).total_seconds() if times else 0.0
+
+
+def merge_exercises(exercises: List[TCXExercise], priorities: Dict[str, List[int]] = None, tolerance: float = 1.0,
+                    only_gps: bool = False, null_value_handling: int = 1) -> TCXExercise:
+    """
+    Merges recordings of the same session from several devices (e.g. a watch and a bike computer).
+    Trackpoints of all exercises are merge-joined by time (a k-way merge of the time sorted trackpoint lists).
+    Trackpoints of different exercises at most `tolerance` seconds apart are deduplicated into one trackpoint
+    whose fields are taken from the exercises by priority. The cumulative distance is taken from a single exercise
+    (the first one in the 'distance' priority that has distances) and continued with GPS distances where it has no
+    values. Lap boundaries, lap calories, LX extensions, activity type and author are taken from the highest
+    priority exercise with laps. Exercise and lap distances are calculated from the merged trackpoints, the
+    exercise calories are taken from the exercise covering the longest time, and all statistics are
+    recalculated.
+    Example, HR from the watch (0), power and cadence from the bike computer (1), GPS from the watch:
+        merge_exercises([watch, bike], priorities={'hr_value': [0, 1], 'Watts': [1, 0], 'cadence': [1, 0]})
+    :param exercises: Exercises to merge. Trackpoint times must be comparable (all timezone aware or all naive).
+    :param priorities: Field -> exercise indices in priority order. Fields are 'position', 'elevation',
+                       'distance', 'hr_value', 'cadence', a TPX extension key (e.g. 'Watts') or 'tpx_ext'
+                       (all other TPX keys), and 'laps'. Missing fields use the order of `exercises`.
+                       A lower priority exercise is used where higher priority ones have no value.
+    :param tolerance: Maximal time difference in seconds of deduplicated trackpoints.
+    :param only_gps: See TCXReader.read().
+    :param null_value_handling: See TCXReader.read().
+    :return: The merged TCXExercise.
+    """
+    if len(exercises) == 0:
+        raise ValueError('No exercises to merge')
+    if priorities is None:
+        priorities = {}
+    order = list(range(len(exercises)))
+
+    distance_sources = [source for source in priorities.get('distance', order)
+                        if any(tp.distance is not None for tp in exercises[source].trackpoints)]
+    distance_source = distance_sources[0] if distance_sources else None
+
+    # k-way merge of the time sorted trackpoints of all exercises
+    streams = [[(tp.time, source, tp) for tp in exercise.trackpoints if tp.time is not None]
+               for source, exercise in enumerate(exercises)]
+    trackpoints = []
+    group = {}
+    group_start = None
+    for time, source, tp in heapq.merge(*streams, key=lambda item: (item[0], item[1])):
+        if group and (source in group or (time - group_start).total_seconds() > tolerance):
+            trackpoints.append(_merge_group(group, order, priorities, distance_source))
+            group = {}
+        if not group:
+            group_start = time
+        group[source] = tp
+    if group:
+        trackpoints.append(_merge_group(group, order, priorities, distance_source))
+    _continue_distance(trackpoints)
+
+    # laps of the highest priority exercise with laps
+    lap_sources = [source for source in priorities.get('laps', order) if exercises[source].laps]
+    primary = exercises[lap_sources[0] if lap_sources else priorities.get('laps', order)[0]]
+    merged = TCXExercise(trackpoints=trackpoints, activity_type=primary.activity_type, calories=0, distance=0,
+                         author=primary.author, tpx_ext_stats={}, lx_ext=dict(primary.lx_ext or {}), laps=[])
+
+    # a partial recording would underestimate the calories of the whole session
+    merged.calories = max(exercises, key=_covered_seconds).calories or 0
+
+    source_laps = [lap for lap in (primary.laps or []) if lap.trackpoints]
+    if not source_laps:
+        merged.laps.append(TCXLap(trackpoints=list(trackpoints), calories=merged.calories))
+    else:
+        boundaries = [lap.trackpoints[0].time for lap in source_laps[1:]]
+        lap_index = 0
+        for lap in source_laps:
+            merged.laps.append(TCXLap(trackpoints=[], calories=lap.calories, lx_ext=dict(lap.lx_ext)))
+        for tp in trackpoints:
+            while lap_index < len(boundaries) and tp.time >= boundaries[lap_index]:
+                lap_index += 1
+            merged.laps[lap_index].trackpoints.append(tp)
+        merged.laps = [lap for lap in merged.laps if lap.trackpoints]
+
+    # lap and exercise distances from the merged cumulative distance
+    lap_start = 0.0
+    for lap in merged.laps:
+        lap_distances = [tp.distance for tp in lap.trackpoints if tp.distance is not None]
+        lap.distance = lap_distances[-1] - lap_start if lap_distances else 0
+        if lap_distances:
+            lap_start = lap_distances[-1]
+    merged.distance = sum(lap.distance for lap in merged.laps)
+
+    return TCXReader().process_exercise(merged, only_gps=only_gps, null_value_handling=null_value_handling)
@@ -0,0 +1,112 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+
+class TCXStageStats:
+    def __init__(self, name: str, wall_time: float = 0.0, points: int = None, allocated_bytes: int = None):
+        """
+        Class for storing measurements of a single stage of TCXReader.read.
+        :param name: Name of the stage (e.g. parse_tcx_file, find_hi_lo_avg).
+        :param wall_time: Wall time spent in the stage in seconds.
+        :param points: Number of trackpoints handled by the stage.
+        :param allocated_bytes: Net bytes allocated during the stage (only if allocations are traced).
+        """
+        self.name: str = name
+        self.wall_time: float = wall_time
+        self.points: int = points
+        self.allocated_bytes: int = allocated_bytes
+
+    def to_dict(self) -> dict:
+        """
+        Convert stage stats to a dictionary.
+        :return: A dictionary containing the stage measurements.
+        """
+        return {
+            'name': self.name,
+            'wall_time': self.wall_time,
+            'points': self.points,
+            'allocated_bytes': self.allocated_bytes,
+        }
+
+
+class TCXReadStats:
+    def __init__(self, on_stage: Callable[[TCXStageStats], None] = None, trace_allocations: bool = False):
+        """
+        Class for collecting per-stage timing of TCXReader.read. Pass an instance to read() and inspect it
+        (or export to_dict()) afterwards. The instance is reset at the start of every read.
+        Timing only costs a few perf_counter calls per read, allocation tracing uses tracemalloc and is much slower.
+        :param on_stage: Callback called with the TCXStageStats of each stage as soon as the stage finishes.
+        :param trace_allocations: If True, net allocated bytes are recorded per stage (using tracemalloc).
+        """
+        self.on_stage: Optional[Callable[[TCXStageStats], None]] = on_stage
+        self.trace_allocations: bool = trace_allocations
+        self.file_location: str = None
+        self.bytes_read: int = None
+        self.points: int = None
+        self.wall_time: float = 0.0
+        self.stages: List[TCXStageStats] = []
+
+    def reset(self, file_location: str = None) -> None:
+        """
+        Clears all measurements before a new read.
+        :param file_location: Path of the file being read.
+        :return: None
+        """
+        self.file_location = file_location
+        self.bytes_read = None
+        self.points = None
+        self.wall_time = 0.0
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Context manager measuring one stage. The yielded TCXStageStats can be used to set the point count.
+        :param name: Name of the stage.
+        :return: TCXStageStats of the stage.
+        """
+        stage_stats = TCXStageStats(name)
+        started_tracing = False
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            memory_start = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            yield stage_stats
+        finally:
+            stage_stats.wall_time = time.perf_counter() - start
+            if self.trace_allocations:
+                stage_stats.allocated_bytes = tracemalloc.get_traced_memory()[0] - memory_start
+                if started_tracing:
+                    tracemalloc.stop()
+            self.wall_time += stage_stats.wall_time
+            self.stages.append(stage_stats)
+            if self.on_stage is not None:
+                self.on_stage(stage_stats)
+
+    def get_stage(self, name: str) -> Optional[TCXStageStats]:
+        """
+        Returns the measurements of the stage with the given name (None if the stage did not run).
+        """
+        for stage_stats in self.stages:
+            if stage_stats.name == name:
+                return stage_stats
+        return None
+
+    def to_dict(self) -> dict:
+        """
+        Convert read stats to a dictionary (e.g. for exporting to a metrics system).
+        :return: A dictionary containing the measurements of the read and of all stages.
+        """
+        return {
+            'file_location': self.file_location,
+            'bytes_read': self.bytes_read,
+            'points': self.points,
+            'wall_time': self.wall_time,
+            'stages': [stage_stats.to_dict() for stage_stats in self.stages],
+        }
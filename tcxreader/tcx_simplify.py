@@ -0,0 +1,152 @@
+import math
+from typing import List, Sequence, Tuple
+
+from tcxreader.tcx_geo import EARTH_RADIUS
+from tcxreader.tcx_track_point import TCXTrackPoint
+
+
+def douglas_peucker(latitudes: Sequence[float], longitudes: Sequence[float], tolerance: float) -> List[int]:
+    """
+    Simplifies a GPS track with the Douglas-Peucker algorithm.
+    Coordinates are projected onto a local equirectangular plane so that the tolerance can be given in meters.
+    The algorithm is iterative (no recursion limit on long tracks).
+    :param latitudes: Latitudes of the track in degrees.
+    :param longitudes: Longitudes of the track in degrees.
+    :param tolerance: Maximum allowed distance (in meters) of a removed point from the simplified track.
+    :return: Sorted indices of the points that are kept.
+    """
+    n = len(latitudes)
+    if n < 3:
+        return list(range(n))
+
+    reference_lat = math.radians(sum(latitudes) / n)
+    x_scale = math.radians(1) * EARTH_RADIUS * math.cos(reference_lat)
+    y_scale = math.radians(1) * EARTH_RADIUS
+    xs = [lon * x_scale for lon in longitudes]
+    ys = [lat * y_scale for lat in latitudes]
+
+    keep = [False] * n
+    keep[0] = keep[n - 1] = True
+    tolerance_sq = tolerance * tolerance
+    stack = [(0, n - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        x1, y1 = xs[first], ys[first]
+        dx, dy = xs[last] - x1, ys[last] - y1
+        segment_sq = dx * dx + dy * dy
+
+        max_dist_sq = -1.0
+        max_index = first
+        for i in range(first + 1, last):
+            px, py = xs[i] - x1, ys[i] - y1
+            if segment_sq != 0:
+                # distance to the segment, not to the infinite line (out-and-back tracks)
+                t = min(max((px * dx + py * dy) / segment_sq, 0.0), 1.0)
+                px, py = px - t * dx, py - t * dy
+            dist_sq = px * px + py * py
+            if dist_sq > max_dist_sq:
+                max_dist_sq = dist_sq
+                max_index = i
+
+        if max_dist_sq > tolerance_sq:
+            keep[max_index] = True
+            stack.append((first, max_index))
+            stack.append((max_index, last))
+
+    return [i for i in range(n) if keep[i]]
+
+
+def largest_triangle_three_buckets(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    """
+    Downsamples a time series with the Largest-Triangle-Three-Buckets (LTTB) algorithm,
+    which preserves the visual shape of the series (peaks and valleys).
+    :param x: X values (e.g. seconds since start), must be sorted.
+    :param y: Y values (e.g. heart rate).
+    :param threshold: Number of points to keep.
+    :return: Sorted indices of the points that are kept.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    sampled = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average point of the next bucket
+        avg_start = int((i + 1) * bucket_size) + 1
+        avg_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_length = avg_end - avg_start
+        avg_x = sum(x[avg_start:avg_end]) / avg_length
+        avg_y = sum(y[avg_start:avg_end]) / avg_length
+
+        # Point of the current bucket forming the largest triangle
+        range_start = int(i * bucket_size) + 1
+        range_end = int((i + 1) * bucket_size) + 1
+        ax, ay = x[a], y[a]
+        max_area = -1.0
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                next_a = j
+
+        sampled.append(next_a)
+        a = next_a
+
+    sampled.append(n - 1)
+    return sampled
+
+
+def simplify_trackpoints(trackpoints: List[TCXTrackPoint], tolerance: float) -> Tuple[List[float], List[float]]:
+    """
+    Simplifies the GPS track of the given trackpoints. Trackpoints without GPS data are skipped.
+    :param trackpoints: List of TCXTrackPoint objects.
+    :param tolerance: Tolerance in meters (see douglas_peucker).
+    :return: Tuple of (latitudes, longitudes) of the simplified track.
+    """
+    latitudes = []
+    longitudes = []
+    for tp in trackpoints:
+        if tp.latitude is not None and tp.longitude is not None:
+            latitudes.append(tp.latitude)
+            longitudes.append(tp.longitude)
+
+    indices = douglas_peucker(latitudes, longitudes, tolerance)
+    return [latitudes[i] for i in indices], [longitudes[i] for i in indices]
+
+
+def downsample_trackpoints(trackpoints: List[TCXTrackPoint], attribute: str,
+                           threshold: int) -> Tuple[List[float], List[float]]:
+    """
+    Downsamples a time series of the given trackpoints. Trackpoints with a missing value are skipped.
+    :param trackpoints: List of TCXTrackPoint objects.
+    :param attribute: Trackpoint attribute (e.g. hr_value, elevation) or TPX extension key (e.g. Speed).
+    :param threshold: Number of points to keep.
+    :return: Tuple of (seconds since the first trackpoint, values) of the downsampled series.
+    :raises ValueError: If the values of the attribute are not numbers (e.g. time or CadenceSensor).
+    """
+    x = []
+    y = []
+    start_time = None
+    for tp in trackpoints:
+        if tp.time is None:
+            continue
+        if hasattr(tp, attribute) and attribute != 'tpx_ext':
+            value = getattr(tp, attribute)
+        else:
+            value = tp.tpx_ext.get(attribute)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f'{attribute!r} is not a numeric series (got {type(value).__name__} values)')
+        if start_time is None:
+            start_time = tp.time
+        x.append((tp.time - start_time).total_seconds())
+        y.append(value)
+
+    indices = largest_triangle_three_buckets(x, y, threshold)
+    return [x[i] for i in indices], [y[i] for i in indices]
@@ -0,0 +1,178 @@
+import math
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+from tcxreader.tcx_geo import EARTH_RADIUS, haversine
+from tcxreader.tcx_exercise import TCXExercise
+
+METERS_PER_DEGREE = math.radians(1) * EARTH_RADIUS
+
+
+class TCXSpatialIndex:
+    def __init__(self, cell_size: float = 0.005):
+        """
+        Grid index of trackpoint positions of one or more exercises, for bounding box, radius and segment queries.
+        Every trackpoint with GPS data is stored in the grid cell containing it, so a query only visits the
+        cells it overlaps instead of scanning all trackpoints.
+        Results refer to trackpoints by their index in the `trackpoints` list of the added exercise.
+        :param cell_size: Size of a grid cell in degrees (0.005 degrees is roughly 550 m of latitude).
+                          Choose it close to the typical query radius.
+        """
+        self.cell_size: float = cell_size
+        self.__cells: Dict[Tuple[int, int], Dict[Hashable, List[int]]] = {}
+        self.__coordinates: Dict[Hashable, Tuple[List[float], List[float]]] = {}
+
+    def __cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return int(math.floor(latitude / self.cell_size)), int(math.floor(longitude / self.cell_size))
+
+    def __len__(self) -> int:
+        return len(self.__coordinates)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__coordinates
+
+    def add(self, key: Hashable, exercise: TCXExercise) -> None:
+        """
+        Adds the trackpoints of an exercise (or lap) to the index.
+        :param key: Identifier of the exercise (e.g. its file name), returned by the queries.
+        :param exercise: TCXExercise or TCXLap.
+        :return: None
+        """
+        if key in self.__coordinates:
+            self.remove(key)
+        latitudes = [tp.latitude for tp in exercise.trackpoints]
+        longitudes = [tp.longitude for tp in exercise.trackpoints]
+        self.__coordinates[key] = (latitudes, longitudes)
+
+        for index, (latitude, longitude) in enumerate(zip(latitudes, longitudes)):
+            if latitude is None or longitude is None:
+                continue
+            cell = self.__cells.setdefault(self.__cell(latitude, longitude), {})
+            cell.setdefault(key, []).append(index)
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Removes an exercise from the index.
+        :param key: Identifier used when adding the exercise.
+        :return: None
+        """
+        latitudes, longitudes = self.__coordinates.pop(key)
+        for latitude, longitude in zip(latitudes, longitudes):
+            if latitude is None or longitude is None:
+                continue
+            cell_key = self.__cell(latitude, longitude)
+            cell = self.__cells.get(cell_key)
+            if cell is not None:
+                cell.pop(key, None)
+                if not cell:
+                    del self.__cells[cell_key]
+
+    def query_bbox(self, min_latitude: float, min_longitude: float, max_latitude: float,
+                   max_longitude: float) -> Dict[Hashable, List[int]]:
+        """
+        Finds trackpoints inside a bounding box.
+        :return: Dictionary of exercise key -> sorted trackpoint indices.
+        """
+        min_row, min_column = self.__cell(min_latitude, min_longitude)
+        max_row, max_column = self.__cell(max_latitude, max_longitude)
+        if (max_row - min_row + 1) * (max_column - min_column + 1) > len(self.__cells):
+            # large box: visiting the occupied cells is cheaper than visiting every cell in the box
+            cells = [cell for (row, column), cell in self.__cells.items()
+                     if min_row <= row <= max_row and min_column <= column <= max_column]
+        else:
+            cells = [self.__cells[(row, column)]
+                     for row in range(min_row, max_row + 1) for column in range(min_column, max_column + 1)
+                     if (row, column) in self.__cells]
+
+        result = {}
+        for cell in cells:
+            for key, indices in cell.items():
+                latitudes, longitudes = self.__coordinates[key]
+                matches = [index for index in indices
+                           if min_latitude <= latitudes[index] <= max_latitude
+                           and min_longitude <= longitudes[index] <= max_longitude]
+                if matches:
+                    result.setdefault(key, []).extend(matches)
+        for indices in result.values():
+            indices.sort()
+        return result
+
+    def query_radius(self, latitude: float, longitude: float, radius: float) -> Dict[Hashable, List[int]]:
+        """
+        Finds trackpoints within a radius of a point.
+        :param latitude: Latitude of the center in degrees.
+        :param longitude: Longitude of the center in degrees.
+        :param radius: Radius in meters.
+        :return: Dictionary of exercise key -> sorted trackpoint indices.
+        """
+        d_latitude = radius / METERS_PER_DEGREE
+        d_longitude = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+        candidates = self.query_bbox(latitude - d_latitude, longitude - d_longitude,
+                                     latitude + d_latitude, longitude + d_longitude)
+        result = {}
+        for key, indices in candidates.items():
+            latitudes, longitudes = self.__coordinates[key]
+            matches = [index for index in indices
+                       if haversine(latitude, longitude, latitudes[index], longitudes[index]) <= radius]
+            if matches:
+                result[key] = matches
+        return result
+
+    def match_segment(self, start: Tuple[float, float], end: Tuple[float, float], radius: float = 25.0,
+                      path: Sequence[Tuple[float, float]] = None) -> List[Tuple[Hashable, int, int]]:
+        """
+        Finds the trackpoint ranges that traverse a segment, i.e. pass within radius of the start point, follow the
+        segment (every trackpoint in between is within radius of its path) and reach the end point. For every
+        traversal the last point near the start and the first point near the end are returned.
+        :param start: (latitude, longitude) of the segment start.
+        :param end: (latitude, longitude) of the segment end.
+        :param radius: Allowed distance in meters from the start/end point and from the path.
+        :param path: (latitude, longitude) points of the segment from start to end (e.g. the course of a climb).
+                     Default: the straight line from start to end.
+        :return: List of (exercise key, start trackpoint index, end trackpoint index).
+        """
+        if path is None:
+            path = [start, end]
+        start_hits = self.query_radius(start[0], start[1], radius)
+        end_hits = self.query_radius(end[0], end[1], radius)
+
+        matches = []
+        for key, start_indices in start_hits.items():
+            end_indices = set(end_hits.get(key, ()))
+            if not end_indices:
+                continue
+            latitudes, longitudes = self.__coordinates[key]
+            start_indices = set(start_indices)
+            last_start = None
+            for index in sorted(end_indices.union(start_indices)):
+                if last_start is not None and index in end_indices:
+                    if _follows_path(latitudes[last_start:index + 1], longitudes[last_start:index + 1], path, radius):
+                        matches.append((key, last_start, index))
+                    last_start = None
+                elif index in start_indices:
+                    last_start = index
+        return matches
+
+
+def _follows_path(latitudes: Sequence[float], longitudes: Sequence[float], path: Sequence[Tuple[float, float]],
+                  radius: float) -> bool:
+    """
+    Checks that every point (points without GPS data are skipped) is within radius of the polyline path.
+    Distances are computed on a local equirectangular projection, which is accurate for segment sized areas.
+    """
+    x_scale = METERS_PER_DEGREE * math.cos(math.radians(path[0][0]))
+    path_xy = [(longitude * x_scale, latitude * METERS_PER_DEGREE) for latitude, longitude in path]
+    radius_sq = radius * radius
+    for latitude, longitude in zip(latitudes, longitudes):
+        if latitude is None or longitude is None:
+            continue
+        x, y = longitude * x_scale, latitude * METERS_PER_DEGREE
+        for (x1, y1), (x2, y2) in zip(path_xy, path_xy[1:]):
+            dx, dy = x2 - x1, y2 - y1
+            segment_sq = dx * dx + dy * dy
+            t = min(max(((x - x1) * dx + (y - y1) * dy) / segment_sq, 0.0), 1.0) if segment_sq else 0.0
+            px, py = x - x1 - t * dx, y - y1 - t * dy
+            if px * px + py * py <= radius_sq:
+                break
+        else:
+            return False
+    return True
@@ -1,15 +1,21 @@
 import datetime
+import gzip
+import os
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
+from itertools import repeat
 from typing import List, Union
 
 from tcxreader.tcx_author import TCXAuthor
 from tcxreader.tcx_exercise import TCXExercise
+from tcxreader.tcx_extensions import GARMIN_XML_EXTENSIONS, TCXExtensionRegistry
+from tcxreader.tcx_geo import cumulative_distance, filter_spikes, segment_distances, speeds
 from tcxreader.tcx_lap import TCXLap
+from tcxreader.tcx_read_stats import TCXReadStats
 from tcxreader.tcx_track_point import TCXTrackPoint
 
 GARMIN_XML_SCHEMA = '{http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2}'
-GARMIN_XML_EXTENSIONS = '{http://www.garmin.com/xmlschemas/ActivityExtension/v2}'
 
 
 class NullValueHandling(Enum):
@@ -21,55 +27,147 @@ class NullValueHandling(Enum):
 
 
 class TCXReader:
-    def __init__(self):
+    def __init__(self, extension_registry: TCXExtensionRegistry = None):
         """
         Class for reading TCX files.
+        :param extension_registry: Types of TPX/LX extension fields (default: known Garmin ActivityExtension fields,
+                                   unknown fields are floats).
         """
-        pass
+        self.extension_registry: TCXExtensionRegistry = extension_registry
+        if self.extension_registry is None:
+            self.extension_registry = TCXExtensionRegistry()
 
-    def read(self, fileLocation: str, only_gps: bool = True, null_value_handling: int = 1) -> TCXExercise:
+    def read(self, fileLocation: str, only_gps: bool = True, null_value_handling: int = 1,
+             fill_distance_from_gps: bool = False, stats: TCXReadStats = None) -> TCXExercise:
         """
         Reads a TCX file and returns a TCXExercise object.
 
-        :param fileLocation: Path to the TCX file.
+        :param fileLocation: Path to the TCX file (gzip compressed if it ends with .gz).
         :param only_gps: If True, remove any Trackpoints at the start/end of the exercise without GPS data.
         :param null_value_handling: How to handle null values:
                                     1 = set to None
                                     2 = linear interpolation
+        :param fill_distance_from_gps: If True, missing trackpoint/lap/exercise distances are computed from
+                                       latitude/longitude and speed spikes are filtered out of max_speed.
+        :param stats: Optional TCXReadStats, filled with wall time, point counts, etc. of each stage of the read.
         :return: A TCXExercise object.
         """
+        if stats is None:
+            stats = TCXReadStats()
+        stats.reset(fileLocation)
+
         # 1) Build an empty TCXExercise container
         tcx_exercise = TCXExercise(calories=0, distance=0, tpx_ext_stats={}, lx_ext={}, laps=[])
 
         # 2) Parse the file into a tree and extract the root
-        tree, root = self.__parse_tcx_file(fileLocation)
+        with stats.stage('parse_tcx_file'):
+            tree, root = self.__parse_tcx_file(fileLocation)
+        stats.bytes_read = os.path.getsize(fileLocation)
 
         # 3) Read all activities and populate the `tcx_exercise` data
-        trackpoints = self.__parse_activities(root, tcx_exercise)
+        with stats.stage('parse_activities') as stage:
+            trackpoints = self.__parse_activities(root, tcx_exercise)
+            stage.points = len(trackpoints)
 
         # 4) Read the file’s author (if present)
-        self.__parse_author(root, tcx_exercise)
-
-        # 5) Remove trackpoints that do not have GPS data if only_gps is True
-        if only_gps:
-            self.__remove_data_at_start_and_end_without_gps(trackpoints)
+        with stats.stage('parse_author'):
+            self.__parse_author(root, tcx_exercise)
 
-        # 6) Store the (possibly truncated) trackpoints in the top-level exercise
+        # 5) Store the trackpoints in the top-level exercise
         tcx_exercise.trackpoints = trackpoints
 
-        # 7) Interpolate missing values if requested
-        if null_value_handling == 2 or null_value_handling == NullValueHandling.LINEAR_INTERPOLATION:
-            tcx_exercise.trackpoints = self.__fill_none_with_averages(tcx_exercise.trackpoints)
+        # 6) Remove trackpoints without GPS, fill missing data and calculate stats
+        return self.process_exercise(tcx_exercise, only_gps, null_value_handling, fill_distance_from_gps, stats)
 
-        # 8) Calculate additional stats (min, max, avg, etc.) at the exercise level
-        tcx_exercise = self.__find_hi_lo_avg(tcx_exercise, only_gps)
-
-        # 9) Handle laps individually (fill missing data + calculate stats)
-        for lap in tcx_exercise.laps:
-            if null_value_handling == 2 or null_value_handling == NullValueHandling.LINEAR_INTERPOLATION:
-                lap.trackpoints = self.__fill_none_with_averages(lap.trackpoints)
-            self.__find_hi_lo_avg(lap, only_gps)
+    def read_all(self, fileLocation: str, only_gps: bool = True, null_value_handling: int = 1,
+                 fill_distance_from_gps: bool = False, workers: int = None) -> List[TCXExercise]:
+        """
+        Reads a TCX file and returns one TCXExercise per <Activity> (including the activities of a
+        <MultiSportSession>, e.g. a triathlon), instead of merging them as read() does.
+        The file is parsed in a single streaming pass and every activity is released as soon as it is parsed.
+
+        :param fileLocation: Path to the TCX file (gzip compressed if it ends with .gz).
+        :param only_gps: See read().
+        :param null_value_handling: See read().
+        :param fill_distance_from_gps: See read().
+        :param workers: If larger than 1, activities are post-processed (interpolation, stats) in parallel
+                        in this many worker processes.
+        :return: A list of TCXExercise objects in the order of the activities in the file.
+        """
+        tcx_exercises = []
+        author = None
+
+        tcx_file = gzip.open(fileLocation, 'rb') if str(fileLocation).endswith('.gz') else open(fileLocation, 'rb')
+        with tcx_file:
+            for _, element in ET.iterparse(tcx_file, events=('end',)):
+                if element.tag == GARMIN_XML_SCHEMA + 'Activity':
+                    tcx_exercise = TCXExercise(calories=0, distance=0, tpx_ext_stats={}, lx_ext={}, laps=[])
+                    tcx_exercise.trackpoints = self.__parse_activity(element, tcx_exercise)
+                    tcx_exercises.append(tcx_exercise)
+                    element.clear()
+                elif element.tag == GARMIN_XML_SCHEMA + 'Author':
+                    author = self.author_parser(element)
+
+        for tcx_exercise in tcx_exercises:
+            tcx_exercise.author = author
+
+        if workers is not None and workers > 1 and len(tcx_exercises) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(self.process_exercise, tcx_exercises, repeat(only_gps),
+                                         repeat(null_value_handling), repeat(fill_distance_from_gps)))
+        return [self.process_exercise(tcx_exercise, only_gps, null_value_handling, fill_distance_from_gps)
+                for tcx_exercise in tcx_exercises]
+
+    def process_exercise(self, tcx_exercise: TCXExercise, only_gps: bool = True, null_value_handling: int = 1,
+                         fill_distance_from_gps: bool = False, stats: TCXReadStats = None) -> TCXExercise:
+        """
+        Post-processes a parsed exercise: removes trackpoints without GPS data, fills missing values and
+        calculates the exercise and lap statistics. Used by read() and read_all().
+
+        :param tcx_exercise: Exercise with trackpoints and laps
+        :param only_gps: See read().
+        :param null_value_handling: See read().
+        :param fill_distance_from_gps: See read().
+        :param stats: Optional TCXReadStats to record the stages in.
+        :return: The processed TCXExercise
+        """
+        if stats is None:
+            stats = TCXReadStats()
+        interpolate = null_value_handling == 2 or null_value_handling == NullValueHandling.LINEAR_INTERPOLATION
+        trackpoints = tcx_exercise.trackpoints
 
+        # 1) Remove trackpoints that do not have GPS data if only_gps is True
+        if only_gps:
+            with stats.stage('remove_data_without_gps') as stage:
+                self.__remove_data_at_start_and_end_without_gps(trackpoints)
+                stage.points = len(trackpoints)
+
+        # 2) Fill missing distances from GPS data if requested
+        if fill_distance_from_gps:
+            with stats.stage('fill_distance_from_gps') as stage:
+                self.__fill_distance_from_gps(tcx_exercise)
+                stage.points = len(tcx_exercise.trackpoints)
+
+        # 3) Interpolate missing values if requested
+        if interpolate:
+            with stats.stage('fill_none_with_averages') as stage:
+                tcx_exercise.trackpoints = self.__fill_none_with_averages(tcx_exercise.trackpoints)
+                stage.points = len(tcx_exercise.trackpoints)
+
+        # 4) Calculate additional stats (min, max, avg, etc.) at the exercise level
+        with stats.stage('find_hi_lo_avg') as stage:
+            tcx_exercise = self.__find_hi_lo_avg(tcx_exercise, only_gps, fill_distance_from_gps)
+            stage.points = len(tcx_exercise.trackpoints)
+
+        # 5) Handle laps individually (fill missing data + calculate stats)
+        with stats.stage('laps') as stage:
+            for lap in tcx_exercise.laps:
+                if interpolate:
+                    lap.trackpoints = self.__fill_none_with_averages(lap.trackpoints)
+                self.__find_hi_lo_avg(lap, only_gps, fill_distance_from_gps)
+            stage.points = sum(len(lap.trackpoints) for lap in tcx_exercise.laps)
+
+        stats.points = len(tcx_exercise.trackpoints)
         return tcx_exercise
 
     # --------------------------------------------------------------------------
@@ -79,11 +177,16 @@ class TCXReader:
     def __parse_tcx_file(self, fileLocation: str) -> Union[ET.ElementTree, ET.Element]:
         """
         Parses an XML file into an ElementTree and returns the tree + root.
+        Files ending with .gz are decompressed on the fly.
 
         :param fileLocation: Path to the TCX file
         :return: (tree, root)
         """
-        tree = ET.parse(fileLocation)
+        if str(fileLocation).endswith('.gz'):
+            with gzip.open(fileLocation, 'rb') as tcx_file:
+                tree = ET.parse(tcx_file)
+        else:
+            tree = ET.parse(fileLocation)
         root = tree.getroot()
         return tree, root
 
@@ -100,18 +203,31 @@ class TCXReader:
 
         for node in root:
             if node.tag == GARMIN_XML_SCHEMA + 'Activities':
-                for activity in node:
-                    if activity.tag == GARMIN_XML_SCHEMA + 'Activity':
-                        # Sport Type
-                        tcx_exercise.activity_type = activity.attrib['Sport']
-
-                        # Parse <Lap> elements inside an Activity
-                        for lap_node in activity:
-                            if lap_node.tag == GARMIN_XML_SCHEMA + 'Lap':
-                                tcx_lap = self.__parse_lap(lap_node, tcx_exercise)
-                                if len(tcx_lap.trackpoints) > 0:
-                                    tcx_exercise.laps.append(tcx_lap)
-                                    trackpoints.extend(tcx_lap.trackpoints)
+                # also finds the activities nested in a <MultiSportSession>
+                for activity in node.iter(GARMIN_XML_SCHEMA + 'Activity'):
+                    trackpoints.extend(self.__parse_activity(activity, tcx_exercise))
+        return trackpoints
+
+    def __parse_activity(self, activity: ET.Element, tcx_exercise: TCXExercise) -> List[TCXTrackPoint]:
+        """
+        Reads a single <Activity> and populates laps and summary data in the `tcx_exercise` object.
+
+        :param activity: The <Activity> element
+        :param tcx_exercise: The exercise container to fill
+        :return: A flat list of the trackpoints of the activity
+        """
+        trackpoints = []
+
+        # Sport Type
+        tcx_exercise.activity_type = activity.attrib['Sport']
+
+        # Parse <Lap> elements inside an Activity
+        for lap_node in activity:
+            if lap_node.tag == GARMIN_XML_SCHEMA + 'Lap':
+                tcx_lap = self.__parse_lap(lap_node, tcx_exercise)
+                if len(tcx_lap.trackpoints) > 0:
+                    tcx_exercise.laps.append(tcx_lap)
+                    trackpoints.extend(tcx_lap.trackpoints)
         return trackpoints
 
     def __parse_lap(self, lap_node: ET.Element, tcx_exercise: TCXExercise) -> TCXLap:
@@ -149,30 +265,7 @@ class TCXReader:
 
             # Lap-level <Extensions>
             elif lap_child.tag == GARMIN_XML_SCHEMA + 'Extensions':
-                for extension in lap_child:
-                    if extension.tag == GARMIN_XML_EXTENSIONS + 'LX':
-                        # Example: <LX><AvgSpeed>...</AvgSpeed>...
-                        for lx_extension in extension:
-                            tag_name = lx_extension.tag.replace(GARMIN_XML_EXTENSIONS, "")
-                            tag_value = lx_extension.text
-                            # Convert to float or int
-                            if '.' in tag_value:
-                                tag_value = float(tag_value)
-                            else:
-                                tag_value = int(tag_value)
-
-                            # Summation into the exercise-level dictionary
-                            if "Avg" in tag_name or "Average" in tag_name or "Max" in tag_name or "Min" in tag_name:
-                                # We skip adding these particular stats to a sum
-                                pass
-                            else:
-                                if tag_name in tcx_exercise.lx_ext:
-                                    tcx_exercise.lx_ext[tag_name] += tag_value
-                                else:
-                                    tcx_exercise.lx_ext[tag_name] = tag_value
-
-                            # Also store in the lap-level dictionary
-                            tcx_lap.lx_ext[tag_name] = tag_value
+                self.lap_extensions_parser(tcx_lap, tcx_exercise, lap_child)
 
         return tcx_lap
 
@@ -187,23 +280,7 @@ class TCXReader:
         """
         for node in root:
             if node.tag == GARMIN_XML_SCHEMA + 'Author':
-                author = TCXAuthor()
-                for author_node in node:
-                    if author_node.tag == GARMIN_XML_SCHEMA + 'Name':
-                        author.name = author_node.text
-                    elif author_node.tag == GARMIN_XML_SCHEMA + 'Build':
-                        for build_node in author_node:
-                            if build_node.tag == GARMIN_XML_SCHEMA + 'Version':
-                                for version_node in build_node:
-                                    if version_node.tag == GARMIN_XML_SCHEMA + 'VersionMajor':
-                                        author.version_major = int(version_node.text)
-                                    elif version_node.tag == GARMIN_XML_SCHEMA + 'VersionMinor':
-                                        author.version_minor = int(version_node.text)
-                                    elif version_node.tag == GARMIN_XML_SCHEMA + 'BuildMajor':
-                                        author.build_major = int(version_node.text)
-                                    elif version_node.tag == GARMIN_XML_SCHEMA + 'BuildMinor':
-                                        author.build_minor = int(version_node.text)
-                tcx_exercise.author = author
+                tcx_exercise.author = self.author_parser(node)
 
     def __remove_data_at_start_and_end_without_gps(self, trackpoints: list) -> None:
         """
@@ -222,6 +299,96 @@ class TCXReader:
         for removal in sorted(removal_list, reverse=True):
             del trackpoints[removal]
 
+    def __fill_distance_from_gps(self, tcx_exercise: TCXExercise) -> None:
+        """
+        Fills trackpoints without DistanceMeters with the distance computed from GPS data. The GPS distance is
+        offset by the last recorded distance, so recorded and computed values stay continuous. Exercise and
+        lap distances missing from the file are derived from the (filled) trackpoint distances.
+
+        :param tcx_exercise: The exercise container to repair (operates in-place)
+        :return: None
+        """
+        trackpoints = tcx_exercise.trackpoints
+        if len(trackpoints) == 0:
+            return
+
+        gps_distances = cumulative_distance(segment_distances([tp.latitude for tp in trackpoints],
+                                                              [tp.longitude for tp in trackpoints]))
+        offset = 0.0
+        for tp, gps_distance in zip(trackpoints, gps_distances):
+            if tp.distance is None:
+                tp.distance = gps_distance + offset
+            else:
+                offset = tp.distance - gps_distance
+
+        if not tcx_exercise.distance:
+            tcx_exercise.distance = trackpoints[-1].distance
+
+        lap_start = 0.0
+        for lap in tcx_exercise.laps:
+            lap_distances = [tp.distance for tp in lap.trackpoints if tp.distance is not None]
+            if lap_distances:
+                if not lap.distance:
+                    lap.distance = lap_distances[-1] - lap_start
+                lap_start = lap_distances[-1]
+
+    def author_parser(self, author_node: ET.Element) -> TCXAuthor:
+        """
+        Parses an <Author> XML element into a TCXAuthor object.
+
+        :param author_node: <Author> element from the TCX
+        :return: A TCXAuthor with the parsed data
+        """
+        author = TCXAuthor()
+        for author_child in author_node:
+            if author_child.tag == GARMIN_XML_SCHEMA + 'Name':
+                author.name = author_child.text
+            elif author_child.tag == GARMIN_XML_SCHEMA + 'Build':
+                for build_node in author_child:
+                    if build_node.tag == GARMIN_XML_SCHEMA + 'Version':
+                        for version_node in build_node:
+                            if version_node.tag == GARMIN_XML_SCHEMA + 'VersionMajor':
+                                author.version_major = int(version_node.text)
+                            elif version_node.tag == GARMIN_XML_SCHEMA + 'VersionMinor':
+                                author.version_minor = int(version_node.text)
+                            elif version_node.tag == GARMIN_XML_SCHEMA + 'BuildMajor':
+                                author.build_major = int(version_node.text)
+                            elif version_node.tag == GARMIN_XML_SCHEMA + 'BuildMinor':
+                                author.build_minor = int(version_node.text)
+        return author
+
+    def lap_extensions_parser(self, tcx_lap: TCXLap, tcx_exercise: TCXExercise, extensions: ET.Element) -> None:
+        """
+        Parses the <Extensions> element of a lap. LX values are stored in the lap's `lx_ext` and, except for
+        Avg/Max/Min values, summed into the exercise's `lx_ext`.
+
+        :param tcx_lap: TCXLap to store the parsed data
+        :param tcx_exercise: TCXExercise to sum the parsed data into
+        :param extensions: <Extensions> element of a <Lap>
+        :return: None
+        """
+        for extension in extensions:
+            if extension.tag == GARMIN_XML_EXTENSIONS + 'LX':
+                # Example: <LX><AvgSpeed>...</AvgSpeed>...
+                for lx_extension in extension:
+                    # Convert to the registered type of the field
+                    tag_name, decode = self.extension_registry.decoder(lx_extension.tag)
+                    tag_value = decode(lx_extension.text)
+
+                    # Summation into the exercise-level dictionary
+                    if "Avg" in tag_name or "Average" in tag_name or "Max" in tag_name or "Min" in tag_name \
+                            or not isinstance(tag_value, (int, float)):
+                        # We skip adding these particular stats (and non-numeric values) to a sum
+                        pass
+                    else:
+                        if tag_name in tcx_exercise.lx_ext:
+                            tcx_exercise.lx_ext[tag_name] += tag_value
+                        else:
+                            tcx_exercise.lx_ext[tag_name] = tag_value
+
+                    # Also store in the lap-level dictionary
+                    tcx_lap.lx_ext[tag_name] = tag_value
+
     def trackpoint_parser(self, tcx_point: TCXTrackPoint, trackpoint: ET.Element) -> None:
         """
         Parses a <Trackpoint> XML element and fills the provided `tcx_point` object.
@@ -291,16 +458,8 @@ class TCXReader:
                     if extension.tag == GARMIN_XML_EXTENSIONS + 'TPX':
                         # e.g. <TPX><Speed>...</Speed><Watts>...</Watts>
                         for tpx_extension in extension:
-                            tag_name = tpx_extension.tag.replace(GARMIN_XML_EXTENSIONS, "")
-                            try:
-                                tag_value = tpx_extension.text
-                                if '.' in tag_value:
-                                    tag_value = float(tag_value)
-                                else:
-                                    tag_value = int(tag_value)
-                                tcx_point.tpx_ext[tag_name] = tag_value
-                            except (ValueError, TypeError):
-                                tcx_point.tpx_ext[tag_name] = None
+                            tag_name, decode = self.extension_registry.decoder(tpx_extension.tag)
+                            tcx_point.tpx_ext[tag_name] = decode(tpx_extension.text)
 
     def __fill_none_with_averages(self, trackpoints: List[TCXTrackPoint]) -> List[TCXTrackPoint]:
         """
@@ -310,22 +469,24 @@ class TCXReader:
         :param trackpoints: List of TCXTrackPoint objects
         :return: A new list of TCXTrackPoint with missing values linearly interpolated
         """
-        def interpolate(start, end, length):
+        def interpolate(start, end, length, value_type):
             """
             Interpolates between two values.
             :param start:
             :param end:
             :param length:
+            :param value_type: Type of the interpolated values (int or float), independent of the type of start
+                               (which is 0 for a leading gap).
             :return:
             """
             step = (end - start) / (length + 1) if length + 1 != 0 else 0
-            type_start = type(start)
-            return [type_start(start + step * i) for i in range(1, length + 1)]
+            return [value_type(start + step * i) for i in range(1, length + 1)]
 
-        def __fill_none_with_averages_for_data(data):
+        def __fill_none_with_averages_for_data(data, value_type):
             """
             Interpolates missing values in data with averages between them.
             :param data:
+            :param value_type: Type of the values (int or float).
             :return:
             """
             result = []
@@ -338,7 +499,7 @@ class TCXReader:
                     end_i = i
                     start_val = data[start_i] if start_i >= 0 else 0
                     end_val = data[end_i] if end_i < len(data) else start_val
-                    result.extend(interpolate(start_val, end_val, end_i - start_i))
+                    result.extend(interpolate(start_val, end_val, end_i - start_i, value_type))
                 else:
                     result.append(data[i])
                     i += 1
@@ -352,17 +513,21 @@ class TCXReader:
             :return:
             """
             data = [getattr(tp, attr) for tp in trackpoints]
-            return __fill_none_with_averages_for_data(data)
+            return __fill_none_with_averages_for_data(data, int if attr in ('hr_value', 'cadence') else float)
 
         # Interpolate for each known extension key
         def interpolate_tpx_ext(key):
             """
-            Interpolates a TPX extension key.
+            Interpolates a TPX extension key. Non-numeric keys (e.g. CadenceSensor) are left as they are.
+            Interpolated values have the type registered in the extension registry.
             :param key:
             :return:
             """
             data = [tp.tpx_ext.get(key) for tp in trackpoints]
-            return __fill_none_with_averages_for_data(data)
+            if any(value is not None and not isinstance(value, (int, float)) for value in data):
+                return data
+            value_type = self.extension_registry.types.get(key, self.extension_registry.default_type)
+            return __fill_none_with_averages_for_data(data, int if value_type is int else float)
 
         attrs_to_interpolate = ['longitude', 'latitude', 'elevation', 'distance', 'hr_value', 'cadence']
         interpolated_attrs = {attr: interpolate_attribute(attr) for attr in attrs_to_interpolate}
@@ -392,7 +557,7 @@ class TCXReader:
 
         return new_trackpoints
 
-    def __find_hi_lo_avg(self, tcx: TCXExercise, only_gps: bool) -> TCXExercise:
+    def __find_hi_lo_avg(self, tcx: TCXExercise, only_gps: bool, filter_speed_spikes: bool = False) -> TCXExercise:
         """
         Finds the highest, lowest, and average values for HR, altitude, cadence,
         speeds, etc. Also calculates total ascent/descent. Stores results in
@@ -400,6 +565,7 @@ class TCXReader:
 
         :param tcx: A TCXExercise (or TCXLap) to modify
         :param only_gps: If True, remove any Trackpoints lacking GPS data
+        :param filter_speed_spikes: If True, outlier spikes are removed before finding max_speed
         :return: The modified tcx (for chaining)
         """
         trackpoints = tcx.trackpoints
@@ -497,24 +663,11 @@ class TCXReader:
             else:
                 tcx.avg_speed = 0.0
 
-            # Max speed: analyze consecutive trackpoints
-            max_speed = 0.0
-            for i in range(1, len(tcx.trackpoints)):
-                prev_tp = tcx.trackpoints[i - 1]
-                curr_tp = tcx.trackpoints[i]
-                try:
-                    dt = abs((prev_tp.time - curr_tp.time).total_seconds())
-                    dist = abs(prev_tp.distance - curr_tp.distance) if (prev_tp.distance and curr_tp.distance) else 0.0
-                    speed = (dist / dt) * 3.6 if dt != 0 else 0
-                    if speed > max_speed:
-                        max_speed = speed
-                except ZeroDivisionError:
-                    print(f"Zero division error at {i}")
-                    pass
-                except Exception as e:
-                    print(f"Error at {i}: {e}")
-                    pass
-            tcx.max_speed = max_speed
+            # Max speed in km/h: analyze consecutive trackpoints (pairs with missing data are skipped)
+            point_speeds = speeds([tp.distance for tp in tcx.trackpoints], [tp.time for tp in tcx.trackpoints])
+            if filter_speed_spikes:
+                point_speeds = filter_spikes(point_speeds)
+            tcx.max_speed = max((speed for speed in point_speeds if speed is not None), default=0.0) * 3.6
         else:
             tcx.start_time = None
             tcx.end_time = None
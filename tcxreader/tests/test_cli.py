@@ -0,0 +1,89 @@
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from tcxreader.cli import main
+from tcxreader.tcx_files import find_tcx_files
+
+
+class TestCLI(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        data = os.path.join(os.path.dirname(__file__), "data")
+        shutil.copy(os.path.join(data, 'cross-country-skiing_activity_1.tcx'), self.directory)
+        with open(os.path.join(data, 'sup_activity_1.tcx'), 'rb') as tcx_file, \
+                gzip.open(os.path.join(self.directory, 'sup_activity_1.tcx.gz'), 'wb') as gz_file:
+            gz_file.write(tcx_file.read())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_find_tcx_files(self):
+        self.assertEqual(len(find_tcx_files([self.directory])), 2)
+        self.assertEqual(len(find_tcx_files([os.path.join(self.directory, '*.gz')])), 1)
+
+    def test_jsonl_and_resume(self):
+        output = os.path.join(self.directory, 'summaries.jsonl')
+        self.assertEqual(main([self.directory, '-o', output, '-j', '2', '-q']), 0)
+        with open(output) as output_file:
+            summaries = [json.loads(line) for line in output_file]
+        self.assertEqual(len(summaries), 2)
+        self.assertEqual(sorted(summary['calories'] for summary in summaries), [92, 532])
+
+        self.assertEqual(main([self.directory, '-o', output, '--resume', '-q']), 0)
+        with open(output) as output_file:
+            self.assertEqual(len(output_file.readlines()), 2)
+
+    def test_csv_and_trackpoints(self):
+        output = os.path.join(self.directory, 'summaries.csv')
+        trackpoints_dir = os.path.join(self.directory, 'trackpoints')
+        self.assertEqual(main([self.directory, '-o', output, '-t', trackpoints_dir, '-j', '1', '-q']), 0)
+        with open(output, newline='') as output_file:
+            rows = list(csv.DictReader(output_file))
+        self.assertEqual(len(rows), 2)
+        with open(os.path.join(trackpoints_dir, 'cross-country-skiing_activity_1.tcx.json')) as columns_file:
+            columns = json.load(columns_file)
+        self.assertEqual(len(columns['time']), 486)
+        self.assertEqual(len(columns['Speed']), 486)
+
+    def test_trackpoints_same_file_names(self):
+        for directory in ('a', 'b'):
+            os.makedirs(os.path.join(self.directory, directory))
+            shutil.copy(os.path.join(self.directory, 'cross-country-skiing_activity_1.tcx'),
+                        os.path.join(self.directory, directory, 'x.tcx'))
+        shutil.copy(os.path.join(self.directory, 'sup_activity_1.tcx.gz'), os.path.join(self.directory, 'a', 'x.tcx.gz'))
+        trackpoints_dir = os.path.join(self.directory, 'trackpoints')
+        self.assertEqual(main([os.path.join(self.directory, 'a'), os.path.join(self.directory, 'b'),
+                               '-t', trackpoints_dir, '-o', os.path.join(self.directory, 'out.jsonl'), '-q']), 0)
+        for name in (os.path.join('a', 'x.tcx.json'), os.path.join('a', 'x.tcx.gz.json'), os.path.join('b', 'x.tcx.json')):
+            self.assertTrue(os.path.isfile(os.path.join(trackpoints_dir, name)), name)
+
+    def test_resume_other_path_spelling(self):
+        output = os.path.join(self.directory, 'summaries.jsonl')
+        self.assertEqual(main([self.directory, '-o', output, '-j', '1', '-q']), 0)
+        other_spelling = os.path.join(self.directory, 'sub', '..')
+        os.makedirs(os.path.join(self.directory, 'sub'))
+        self.assertEqual(main([other_spelling, '-o', output, '--resume', '-q']), 0)
+        with open(output) as output_file:
+            self.assertEqual(len(output_file.readlines()), 2)
+
+    def test_resume_after_interrupted_run(self):
+        for output_format in ('jsonl', 'csv'):
+            output = os.path.join(self.directory, 'summaries.' + output_format)
+            self.assertEqual(main([self.directory, '-o', output, '-j', '1', '-q']), 0)
+            # an interrupted run leaves a truncated last record
+            with open(output, 'rb+') as output_file:
+                output_file.truncate(os.path.getsize(output) - 30)
+            self.assertEqual(main([self.directory, '-o', output, '--resume', '-q']), 0)
+
+            with open(output, newline='') as output_file:
+                if output_format == 'csv':
+                    summaries = list(csv.DictReader(output_file))
+                else:
+                    summaries = [json.loads(line) for line in output_file]
+            self.assertEqual(len(summaries), 2, output_format)
+            self.assertEqual(sorted(int(summary['calories']) for summary in summaries), [92, 532])
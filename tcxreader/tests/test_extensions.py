@@ -0,0 +1,73 @@
+import itertools
+import os
+import re
+import tempfile
+from unittest import TestCase
+
+from tcxreader.tcx_extensions import GARMIN_XML_EXTENSIONS, TCXExtensionRegistry
+from tcxreader.tcxreader import TCXExercise, TCXReader
+
+
+class TestTCXExtensionRegistry(TestCase):
+    def test_decoder(self):
+        registry = TCXExtensionRegistry()
+        name, decode = registry.decoder(GARMIN_XML_EXTENSIONS + 'Speed')
+        self.assertEqual(name, 'Speed')
+        self.assertIsInstance(decode('3'), float)
+        self.assertEqual(registry.decoder(GARMIN_XML_EXTENSIONS + 'Watts')[1]('250.0'), 250)
+        self.assertEqual(registry.decoder(GARMIN_XML_EXTENSIONS + 'CadenceSensor')[1](' Bike '), 'Bike')
+        self.assertIsNone(registry.decoder(GARMIN_XML_EXTENSIONS + 'Watts')[1](None))
+        self.assertIsNone(registry.decoder(GARMIN_XML_EXTENSIONS + 'Speed')[1]('fast'))
+        self.assertIsInstance(registry.decoder(GARMIN_XML_EXTENSIONS + 'Unknown')[1]('7'), float)
+
+    def test_register(self):
+        registry = TCXExtensionRegistry(types={'Temperature': int})
+        self.assertEqual(registry.decoder(GARMIN_XML_EXTENSIONS + 'Temperature')[1]('21'), 21)
+        registry.register('Temperature', float)
+        self.assertIsInstance(registry.decoder(GARMIN_XML_EXTENSIONS + 'Temperature')[1]('21'), float)
+
+
+class TestTypedExtensions(TestCase):
+    def setUp(self):
+        filename = os.path.join(os.path.dirname(__file__), "data", 'cross-country-skiing_activity_1.tcx')
+        with open(filename, encoding='UTF-8') as tcx_file:
+            content = tcx_file.read()
+        # a speed written without decimals must still be decoded as float
+        content = content.replace('<ns3:Speed>0.0</ns3:Speed>', '<ns3:Speed>0</ns3:Speed>')
+        handle, self.filename = tempfile.mkstemp(suffix='.tcx')
+        with os.fdopen(handle, 'w', encoding='UTF-8') as tcx_file:
+            tcx_file.write(content)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_fixed_types(self):
+        tcx: TCXExercise = TCXReader().read(self.filename)
+        columns = tcx.trackpoints_to_columns()
+        self.assertEqual({type(value) for value in columns['Speed'] if value is not None}, {float})
+        self.assertEqual({type(value) for value in columns['RunCadence'] if value is not None}, {int})
+        self.assertEqual(tcx.laps[0].lx_ext["AvgRunCadence"], 38)
+        self.assertIsInstance(tcx.laps[0].lx_ext["AvgSpeed"], float)
+
+    def test_custom_registry(self):
+        tcx: TCXExercise = TCXReader(TCXExtensionRegistry(types={'RunCadence': float})).read(self.filename)
+        self.assertIsInstance(tcx.trackpoints[0].tpx_ext['RunCadence'], float)
+
+    def test_interpolation_keeps_types(self):
+        with open(self.filename, encoding='UTF-8') as tcx_file:
+            content = tcx_file.read()
+        # undecodable values at the start (a leading gap is interpolated from 0) and in the middle
+        gaps = set(range(4)).union(range(100, 104))
+        for key in ('Speed', 'RunCadence'):
+            counter = itertools.count()
+            content = re.sub(f'(<ns3:{key}>)[^<]*',
+                             lambda match: match.group(1) + 'missing' if next(counter) in gaps else match.group(0),
+                             content)
+        with open(self.filename, 'w', encoding='UTF-8') as tcx_file:
+            tcx_file.write(content)
+
+        tcx: TCXExercise = TCXReader().read(self.filename, null_value_handling=2)
+        columns = tcx.trackpoints_to_columns()
+        self.assertIsNone(TCXReader().read(self.filename).trackpoints[0].tpx_ext['Speed'])
+        self.assertEqual({type(value) for value in columns['Speed']}, {float})
+        self.assertEqual({type(value) for value in columns['RunCadence']}, {int})
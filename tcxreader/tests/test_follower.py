@@ -0,0 +1,123 @@
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from unittest import TestCase, mock
+
+from tcxreader.tcx_follower import TCXFollower
+from tcxreader.tcxreader import GARMIN_XML_SCHEMA, TCXExercise, TCXReader
+
+
+class TestTCXFollower(TestCase):
+    def setUp(self):
+        filename = os.path.join(os.path.dirname(__file__), "data", 'cross-country-skiing_activity_1.tcx')
+        with open(filename, 'rb') as tcx_file:
+            self.content = tcx_file.read()
+        self.tcx: TCXExercise = TCXReader().read(filename)
+        handle, self.filename = tempfile.mkstemp(suffix='.tcx')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_incremental(self):
+        follower = TCXFollower(self.filename)
+        trackpoints, laps = [], []
+        chunk_size = 10000
+        for start in range(0, len(self.content), chunk_size):
+            with open(self.filename, 'ab') as tcx_file:
+                tcx_file.write(self.content[start:start + chunk_size])
+            new_trackpoints, new_laps = follower.poll()
+            trackpoints.extend(new_trackpoints)
+            laps.extend(new_laps)
+            self.assertEqual(len(follower.exercise.trackpoints), len(trackpoints))
+
+        self.assertEqual(follower.poll(), ([], []))
+        self.assertEqual(len(trackpoints), len(self.tcx.trackpoints))
+        self.assertEqual(len(laps), 2)
+
+        exercise = follower.exercise
+        for attribute in ('activity_type', 'calories', 'distance', 'hr_avg', 'hr_max', 'hr_min', 'duration',
+                          'start_time', 'end_time', 'avg_speed', 'max_speed', 'altitude_min', 'altitude_max'):
+            self.assertEqual(getattr(exercise, attribute), getattr(self.tcx, attribute), attribute)
+        self.assertAlmostEqual(exercise.ascent, self.tcx.ascent)
+        self.assertAlmostEqual(exercise.altitude_avg, self.tcx.altitude_avg)
+        self.assertEqual(exercise.lx_ext, self.tcx.lx_ext)
+        self.assertEqual(exercise.tpx_ext_stats['Speed']['max'], self.tcx.tpx_ext_stats['Speed']['max'])
+        self.assertEqual(exercise.author.name, self.tcx.author.name)
+        self.assertEqual(laps[1].hr_avg, self.tcx.laps[1].hr_avg)
+        self.assertEqual(laps[0].lx_ext, self.tcx.laps[0].lx_ext)
+
+    def test_rewritten_file(self):
+        with open(self.filename, 'wb') as tcx_file:
+            tcx_file.write(self.content)
+        follower = TCXFollower(self.filename)
+        follower.poll()
+        with open(self.filename, 'wb') as tcx_file:
+            tcx_file.write(self.content[:50000])
+        follower.poll()
+        self.assertLess(len(follower.exercise.trackpoints), len(self.tcx.trackpoints))
+        self.assertEqual(follower.offset, 50000)
+
+    def snapshot(self, trackpoint_count: int) -> bytes:
+        """
+        Returns a valid (closed) document with the first trackpoint_count trackpoints, as written by a writer that
+        overwrites the closing tags on every save.
+        """
+        root = ET.fromstring(self.content)
+        count = 0
+        for lap in root.iter(GARMIN_XML_SCHEMA + 'Lap'):
+            for track in lap.findall(GARMIN_XML_SCHEMA + 'Track'):
+                for trackpoint in list(track):
+                    count += 1
+                    if count > trackpoint_count:
+                        track.remove(trackpoint)
+        for activity in root.iter(GARMIN_XML_SCHEMA + 'Activity'):
+            for lap in activity.findall(GARMIN_XML_SCHEMA + 'Lap'):
+                if not any(len(track) for track in lap.findall(GARMIN_XML_SCHEMA + 'Track')):
+                    activity.remove(lap)
+        return ET.tostring(root)
+
+    def test_rewritten_closed_document(self):
+        follower = TCXFollower(self.filename, only_gps=False)
+        trackpoints = []
+        for trackpoint_count in (50, 100):
+            with open(self.filename, 'wb') as tcx_file:
+                tcx_file.write(self.snapshot(trackpoint_count))
+            trackpoints.extend(follower.poll()[0])
+            self.assertEqual(len(follower.exercise.trackpoints), trackpoint_count)
+        self.assertEqual(follower.poll(), ([], []))
+        self.assertEqual(len(trackpoints), 100)
+        self.assertEqual(trackpoints[99].time, follower.exercise.trackpoints[99].time)
+
+    def test_overwritten_closing_tags(self):
+        follower = TCXFollower(self.filename)
+        exercise = follower.exercise
+        trackpoints = []
+        with mock.patch.object(follower, 'reset', wraps=follower.reset) as reset:
+            for trackpoint_count in range(25, len(self.tcx.trackpoints) + 25, 25):
+                with open(self.filename, 'wb') as tcx_file:
+                    tcx_file.write(self.snapshot(trackpoint_count))
+                trackpoints.extend(follower.poll()[0])
+            # only the overwritten closing tags are parsed again, never the whole file
+            reset.assert_not_called()
+
+        self.assertIs(follower.exercise, exercise)
+        self.assertEqual(len(trackpoints), len(self.tcx.trackpoints))
+        self.assertEqual(len(exercise.laps), len(self.tcx.laps))
+        for attribute in ('calories', 'distance', 'hr_avg', 'duration', 'max_speed', 'lx_ext'):
+            self.assertEqual(getattr(exercise, attribute), getattr(self.tcx, attribute), attribute)
+        self.assertEqual([len(lap.trackpoints) for lap in exercise.laps],
+                         [len(lap.trackpoints) for lap in self.tcx.laps])
+        self.assertEqual(exercise.laps[0].lx_ext, self.tcx.laps[0].lx_ext)
+
+    def test_reset_keeps_exercise(self):
+        with open(self.filename, 'wb') as tcx_file:
+            tcx_file.write(self.content)
+        follower = TCXFollower(self.filename)
+        exercise = follower.exercise
+        follower.poll()
+        with open(self.filename, 'wb') as tcx_file:
+            tcx_file.write(self.content[:50000])
+        follower.poll()
+        self.assertIs(follower.exercise, exercise)
+        self.assertLess(len(exercise.trackpoints), len(self.tcx.trackpoints))
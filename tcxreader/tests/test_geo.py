@@ -0,0 +1,66 @@
+import datetime
+import os
+import re
+import tempfile
+from unittest import TestCase
+
+from tcxreader.tcx_geo import cumulative_distance, filter_spikes, grades, haversine, segment_distances, speeds, \
+    vincenty
+from tcxreader.tcxreader import TCXExercise, TCXReader
+
+
+class TestGeo(TestCase):
+    def test_haversine(self):
+        # one degree of latitude is roughly 111.2 km
+        self.assertAlmostEqual(haversine(46.0, 15.0, 47.0, 15.0), 111195, delta=10)
+
+    def test_vincenty(self):
+        self.assertAlmostEqual(vincenty(46.0, 15.0, 47.0, 15.0), 111169, delta=10)
+        self.assertEqual(vincenty(46.0, 15.0, 46.0, 15.0), 0.0)
+
+    def test_segment_and_cumulative_distance(self):
+        segments = segment_distances([46.0, 46.001, None, 46.003], [15.0, 15.0, None, 15.0])
+        self.assertEqual(segments[0], 0.0)
+        self.assertAlmostEqual(segments[1], 111.2, places=1)
+        self.assertIsNone(segments[2])
+        self.assertIsNone(segments[3])
+        self.assertAlmostEqual(cumulative_distance(segments)[-1], 111.2, places=1)
+
+    def test_speeds_and_grades(self):
+        start = datetime.datetime(2020, 1, 1)
+        times = [start + datetime.timedelta(seconds=s) for s in (0, 10, 10, 20)]
+        self.assertEqual(speeds([0.0, 50.0, 60.0, 100.0], times), [0.0, 5.0, None, 4.0])
+        self.assertEqual(grades([0.0, 100.0, 100.5], [10.0, 15.0, 16.0]), [0.0, 5.0, None])
+
+    def test_filter_spikes(self):
+        self.assertEqual(filter_spikes([5.0, 5.2, 5.1, 50.0, 5.0, 4.9, 5.1]), [5.0, 5.2, 5.1, 5.1, 5.0, 4.9, 5.1])
+        self.assertEqual(filter_spikes([5.0, None, 5.0], max_value=4.0), [None, None, None])
+
+
+class TestFillDistanceFromGPS(TestCase):
+    def setUp(self):
+        filename = os.path.join(os.path.dirname(__file__), "data", 'sup_activity_1.tcx')
+        with open(filename, encoding='UTF-8') as tcx_file:
+            content = tcx_file.read()
+        # remove all distances from the file (trackpoints and laps)
+        content = re.sub(r'<DistanceMeters>[^<]*</DistanceMeters>', '', content)
+        handle, self.filename = tempfile.mkstemp(suffix='.tcx')
+        with os.fdopen(handle, 'w', encoding='UTF-8') as tcx_file:
+            tcx_file.write(content)
+        self.tcx_original: TCXExercise = TCXReader().read(filename)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_without_fill(self):
+        tcx = TCXReader().read(self.filename)
+        self.assertEqual(tcx.distance, 0)
+        self.assertEqual(tcx.max_speed, 0.0)
+
+    def test_fill(self):
+        tcx = TCXReader().read(self.filename, fill_distance_from_gps=True)
+        self.assertTrue(all(tp.distance is not None for tp in tcx.trackpoints))
+        self.assertAlmostEqual(tcx.distance, self.tcx_original.distance, delta=self.tcx_original.distance * 0.1)
+        self.assertAlmostEqual(sum(lap.distance for lap in tcx.laps), tcx.distance, places=5)
+        self.assertGreater(tcx.max_speed, 0)
+        self.assertGreater(tcx.avg_speed, 0)
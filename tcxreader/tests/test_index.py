@@ -0,0 +1,104 @@
+import datetime
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, mock
+
+from tcxreader import tcx_index as index_module
+from tcxreader.tcx_index import TCXIndex
+
+
+class TestTCXIndex(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        data = os.path.join(os.path.dirname(__file__), "data")
+        for name in ('cross-country-skiing_activity_1.tcx', 'sup_activity_1.tcx', 'mapmyride_biking.tcx'):
+            shutil.copy(os.path.join(data, name), self.directory)
+        self.index = TCXIndex(os.path.join(self.directory, 'index.sqlite'))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def test_update(self):
+        self.assertEqual(self.index.update([self.directory])['added'], 3)
+        counts = self.index.update([self.directory])
+        self.assertEqual(counts['unchanged'], 3)
+        self.assertEqual(counts['added'] + counts['updated'], 0)
+
+        # touched but unchanged content is not parsed again
+        os.utime(os.path.join(self.directory, 'sup_activity_1.tcx'), (0, 0))
+        self.assertEqual(self.index.update([self.directory])['unchanged'], 3)
+
+        os.remove(os.path.join(self.directory, 'sup_activity_1.tcx'))
+        self.assertEqual(self.index.update([self.directory], remove_missing=True)['removed'], 1)
+        self.assertEqual(len(self.index.query()), 2)
+
+    def test_query(self):
+        self.index.update([self.directory])
+        rides = self.index.query(activity_type='Biking', min_distance=10000,
+                                 start_after=datetime.datetime(2022, 1, 1), start_before=datetime.datetime(2023, 1, 1))
+        self.assertEqual(len(rides), 1)
+        self.assertEqual(rides[0].calories, 458)
+        self.assertEqual(rides[0].start_time, datetime.datetime(2022, 11, 12, 15, 58, 31, 473500))
+
+        activities = self.index.query(min_hr_avg=140, order_by='distance')
+        self.assertEqual([os.path.basename(activity.file) for activity in activities],
+                         ['cross-country-skiing_activity_1.tcx'])
+        self.assertEqual(len(activities[0].read().trackpoints), activities[0].trackpoints)
+        self.assertEqual(len(self.index.laps(activities[0].file)), 2)
+
+        self.assertEqual(len(self.index.query(bbox=(46.4, 15.4, 46.6, 15.6))), 1)
+        self.assertEqual(len(self.index.query(where='calories < ?', params=(100,))), 1)
+
+    def test_import_does_not_load_cli(self):
+        code = 'import sys, tcxreader; sys.exit("tcxreader.cli" in sys.modules)'
+        self.assertEqual(subprocess.run([sys.executable, '-c', code]).returncode, 0)
+
+    def test_failures(self):
+        broken = os.path.join(self.directory, 'broken.tcx')
+        with open(broken, 'w') as tcx_file:
+            tcx_file.write('<TrainingCenterDatabase>')
+        counts = self.index.update([self.directory])
+        self.assertEqual((counts['added'], counts['failed']), (3, 1))
+        self.assertIn('ParseError', self.index.failures()[broken])
+
+        # unchanged failures are not parsed again
+        with mock.patch('tcxreader.tcx_index._summarize') as summarize:
+            self.assertEqual(self.index.update([self.directory])['failed'], 1)
+            summarize.assert_not_called()
+
+        # a changed file that cannot be parsed anymore is removed from the activities
+        sup = os.path.join(self.directory, 'sup_activity_1.tcx')
+        with open(sup, 'w') as tcx_file:
+            tcx_file.write('<TrainingCenterDatabase>')
+        self.assertEqual(self.index.update([self.directory])['failed'], 2)
+        self.assertIsNone(self.index.get(sup))
+        self.assertEqual(self.index.laps(sup), [])
+        self.assertEqual(len(self.index.query()), 2)
+
+        shutil.copy(os.path.join(os.path.dirname(__file__), "data", 'sup_activity_1.tcx'), sup)
+        self.assertEqual(self.index.update([self.directory])['added'], 1)
+        self.assertEqual(list(self.index.failures()), [broken])
+
+    def test_interrupted_update_keeps_progress(self):
+        summarize = index_module._summarize
+
+        def interrupt_third(file, calls=[]):
+            calls.append(file)
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return summarize(file)
+
+        with mock.patch.object(index_module, 'COMMIT_INTERVAL', 1), \
+                mock.patch.object(index_module, '_summarize', interrupt_third):
+            with self.assertRaises(KeyboardInterrupt):
+                self.index.update([self.directory])
+        self.index.close()
+
+        self.index = TCXIndex(os.path.join(self.directory, 'index.sqlite'))
+        self.assertEqual(len(self.index.query()), 2)
+        counts = self.index.update([self.directory])
+        self.assertEqual((counts['unchanged'], counts['added']), (2, 1))
@@ -0,0 +1,72 @@
+import datetime
+import os
+from unittest import TestCase
+
+from tcxreader.tcx_merge import merge_exercises
+from tcxreader.tcxreader import TCXExercise, TCXReader
+
+
+class TestMergeExercises(TestCase):
+    def setUp(self):
+        self.filename = os.path.join(os.path.dirname(__file__), "data", 'cross-country-skiing_activity_1.tcx')
+        self.watch: TCXExercise = TCXReader().read(self.filename)
+        # a second device: no heart rate, but power, recording half a second later
+        self.bike: TCXExercise = TCXReader().read(self.filename)
+        for tp in self.bike.trackpoints:
+            tp.hr_value = None
+            tp.time += datetime.timedelta(seconds=0.5)
+            tp.tpx_ext['Watts'] = 200
+
+    def test_merge(self):
+        merged = merge_exercises([self.watch, self.bike], priorities={'hr_value': [1, 0], 'Watts': [1, 0]})
+        self.assertEqual(len(merged.trackpoints), len(self.watch.trackpoints))
+        self.assertEqual(merged.trackpoints[0].time, self.watch.trackpoints[0].time)
+        self.assertEqual(merged.hr_avg, self.watch.hr_avg)
+        self.assertEqual(merged.tpx_ext_stats['Watts']['avg'], 200)
+        self.assertEqual(merged.tpx_ext_stats['Speed'], self.watch.tpx_ext_stats['Speed'])
+        self.assertEqual(merged.calories, self.watch.calories)
+        self.assertAlmostEqual(merged.distance, self.watch.distance, places=1)
+        self.assertEqual([len(lap.trackpoints) for lap in merged.laps],
+                         [len(lap.trackpoints) for lap in self.watch.laps])
+
+    def test_partial_overlap(self):
+        self.bike.trackpoints = self.bike.trackpoints[200:]
+        self.bike.laps = []
+        merged = merge_exercises([self.bike, self.watch])
+        self.assertEqual(len(merged.trackpoints), len(self.watch.trackpoints))
+        self.assertEqual(len(merged.laps), 2)
+        self.assertNotIn('Watts', merged.trackpoints[199].tpx_ext)
+        self.assertEqual(merged.trackpoints[200].tpx_ext['Watts'], 200)
+        self.assertEqual(merged.trackpoints[200].time, self.bike.trackpoints[0].time)
+
+    def test_tolerance(self):
+        merged = merge_exercises([self.watch, self.bike], tolerance=0.1)
+        self.assertEqual(len(merged.trackpoints), 2 * len(self.watch.trackpoints))
+
+    def test_distance_from_one_source(self):
+        for tp in self.bike.trackpoints:
+            tp.distance *= 1.03
+        for tp in self.watch.trackpoints[100:110]:
+            tp.distance = None
+        merged = merge_exercises([self.watch, self.bike])
+        distances = [tp.distance for tp in merged.trackpoints]
+        self.assertEqual(distances, sorted(distances))
+        self.assertLess(merged.max_speed, 1.5 * self.watch.max_speed)
+        self.assertAlmostEqual(merged.distance, self.watch.distance, delta=10)
+
+    def test_partial_overlap_with_laps(self):
+        # the primary exercise (with laps) only recorded the first 100 trackpoints
+        self.watch.trackpoints = self.watch.trackpoints[:100]
+        self.watch.laps = self.watch.laps[:1]
+        self.watch.laps[0].trackpoints = self.watch.laps[0].trackpoints[:100]
+        self.watch.laps[0].distance = self.watch.trackpoints[-1].distance
+        self.watch.distance = self.watch.laps[0].distance
+        full: TCXExercise = TCXReader().read(self.filename)
+        merged = merge_exercises([self.watch, full])
+        self.assertEqual(len(merged.trackpoints), len(full.trackpoints))
+        self.assertEqual(len(merged.laps), 1)
+        # distances after the primary exercise ends are continued with GPS distances
+        self.assertAlmostEqual(merged.distance, full.distance, delta=0.01 * full.distance)
+        self.assertAlmostEqual(merged.laps[0].distance, merged.distance)
+        self.assertAlmostEqual(merged.avg_speed, full.avg_speed, delta=0.01 * full.avg_speed)
+        self.assertEqual(merged.calories, full.calories)
@@ -0,0 +1,58 @@
+import os
+import re
+import tempfile
+from unittest import TestCase
+
+from tcxreader.tcxreader import TCXExercise, TCXReader
+
+
+class TestMultiActivity(TestCase):
+    def setUp(self):
+        data = os.path.join(os.path.dirname(__file__), "data")
+        activities = []
+        for name in ('sup_activity_1.tcx', 'cross-country-skiing_activity_1.tcx'):
+            with open(os.path.join(data, name), encoding='UTF-8') as tcx_file:
+                activities.append(re.search(r'<Activity .*</Activity>', tcx_file.read(), re.S).group(0))
+        with open(os.path.join(data, 'sup_activity_1.tcx'), encoding='UTF-8') as tcx_file:
+            content = tcx_file.read()
+        self.single = TCXReader().read(os.path.join(data, 'sup_activity_1.tcx'))
+        self.filenames = []
+
+        two_activities = content.replace(activities[0], activities[0] + activities[1].replace('Sport="Other"',
+                                                                                               'Sport="Running"'))
+        multisport = content.replace(
+            '<Activities>\n    ' + activities[0],
+            '<Activities><MultiSportSession><Id>2022-07-16T16:08:25.000Z</Id><FirstSport>' + activities[0] +
+            '</FirstSport><NextSport>' + activities[1].replace('Sport="Other"', 'Sport="Running"') +
+            '</NextSport></MultiSportSession>')
+        for file_content in (two_activities, multisport):
+            handle, filename = tempfile.mkstemp(suffix='.tcx')
+            with os.fdopen(handle, 'w', encoding='UTF-8') as tcx_file:
+                tcx_file.write(file_content)
+            self.filenames.append(filename)
+
+    def tearDown(self):
+        for filename in self.filenames:
+            os.remove(filename)
+
+    def test_read_all(self):
+        for filename in self.filenames:
+            exercises = TCXReader().read_all(filename)
+            self.assertEqual([exercise.activity_type for exercise in exercises], ['Other', 'Running'])
+            self.assertEqual(exercises[0].calories, self.single.calories)
+            self.assertEqual(exercises[0].distance, self.single.distance)
+            self.assertEqual(exercises[0].hr_avg, self.single.hr_avg)
+            self.assertEqual(len(exercises[1].trackpoints), 486)
+            self.assertEqual(exercises[1].calories, 532)
+            self.assertEqual(exercises[1].author.name, 'Connect Api')
+
+    def test_read_merges(self):
+        merged: TCXExercise = TCXReader().read(self.filenames[1])
+        self.assertEqual(len(merged.trackpoints), len(self.single.trackpoints) + 486)
+        self.assertEqual(merged.calories, self.single.calories + 532)
+
+    def test_read_all_parallel(self):
+        exercises = TCXReader().read_all(self.filenames[0], workers=2, null_value_handling=2)
+        self.assertEqual(len(exercises), 2)
+        self.assertEqual(exercises[0].hr_max, self.single.hr_max)
+        self.assertEqual(len(exercises[1].laps), 2)
@@ -0,0 +1,37 @@
+import os
+from unittest import TestCase
+
+from tcxreader.tcx_read_stats import TCXReadStats
+from tcxreader.tcxreader import TCXReader
+
+
+class TestReadStats(TestCase):
+    def setUp(self):
+        self.filename = os.path.join(os.path.dirname(__file__), "data", 'cross-country-skiing_activity_1.tcx')
+
+    def test_stages(self):
+        stats = TCXReadStats()
+        tcx = TCXReader().read(self.filename, stats=stats)
+        self.assertEqual([stage.name for stage in stats.stages],
+                         ['parse_tcx_file', 'parse_activities', 'parse_author', 'remove_data_without_gps',
+                          'find_hi_lo_avg', 'laps'])
+        self.assertEqual(stats.bytes_read, os.path.getsize(self.filename))
+        self.assertEqual(stats.points, len(tcx.trackpoints))
+        self.assertEqual(stats.get_stage('find_hi_lo_avg').points, len(tcx.trackpoints))
+        self.assertAlmostEqual(stats.wall_time, sum(stage.wall_time for stage in stats.stages))
+        self.assertIsNone(stats.get_stage('fill_none_with_averages'))
+
+    def test_callback_and_reuse(self):
+        finished = []
+        stats = TCXReadStats(on_stage=finished.append)
+        reader = TCXReader()
+        reader.read(self.filename, stats=stats, null_value_handling=2)
+        self.assertEqual(len(finished), 7)
+        reader.read(self.filename, stats=stats)
+        self.assertEqual(len(stats.stages), 6)
+        self.assertEqual(stats.to_dict()['stages'][0]['name'], 'parse_tcx_file')
+
+    def test_trace_allocations(self):
+        stats = TCXReadStats(trace_allocations=True)
+        TCXReader().read(self.filename, stats=stats)
+        self.assertGreater(stats.get_stage('parse_tcx_file').allocated_bytes, 0)
@@ -0,0 +1,60 @@
+import os
+from unittest import TestCase
+
+from tcxreader.tcx_simplify import douglas_peucker, largest_triangle_three_buckets
+from tcxreader.tcxreader import TCXExercise, TCXReader
+
+
+class TestSimplify(TestCase):
+    def setUp(self):
+        filename = os.path.join(os.path.dirname(__file__), "data", 'cross-country-skiing_activity_1.tcx')
+        self.tcx: TCXExercise = TCXReader().read(filename)
+
+    def test_douglas_peucker_straight_line(self):
+        latitudes = [46.0 + i * 0.001 for i in range(10)]
+        longitudes = [15.0] * 10
+        self.assertEqual(douglas_peucker(latitudes, longitudes, 1.0), [0, 9])
+
+    def test_douglas_peucker_keeps_corner(self):
+        latitudes = [46.0, 46.001, 46.002, 46.002, 46.002]
+        longitudes = [15.0, 15.0, 15.0, 15.001, 15.002]
+        self.assertEqual(douglas_peucker(latitudes, longitudes, 1.0), [0, 2, 4])
+
+    def test_douglas_peucker_keeps_turnaround(self):
+        # out-and-back: the turnaround lies on the line through the endpoints, but not on the segment
+        latitudes = [46.0, 46.001, 46.002, 46.003, 46.0005]
+        longitudes = [15.0] * 5
+        self.assertEqual(douglas_peucker(latitudes, longitudes, 1.0), [0, 3, 4])
+
+    def test_lttb(self):
+        x = list(range(100))
+        y = [0] * 100
+        y[42] = 10
+        indices = largest_triangle_three_buckets(x, y, 10)
+        self.assertEqual(len(indices), 10)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 99)
+        self.assertIn(42, indices)
+
+    def test_simplify_track(self):
+        latitudes, longitudes = self.tcx.simplify_track(tolerance=5.0)
+        self.assertEqual(len(latitudes), len(longitudes))
+        self.assertLess(len(latitudes), len(self.tcx.trackpoints))
+        self.assertEqual(latitudes[0], self.tcx.trackpoints[0].latitude)
+        self.assertEqual(longitudes[-1], self.tcx.trackpoints[-1].longitude)
+
+    def test_downsample(self):
+        seconds, hr = self.tcx.downsample('hr_value', threshold=50)
+        self.assertEqual(len(seconds), 50)
+        self.assertEqual(seconds[0], 0)
+        self.assertEqual(max(hr), self.tcx.hr_max)
+
+        seconds, speed = self.tcx.laps[0].downsample('Speed', threshold=20)
+        self.assertEqual(len(speed), 20)
+
+    def test_downsample_non_numeric(self):
+        with self.assertRaises(ValueError):
+            self.tcx.downsample('time', threshold=50)
+        self.tcx.trackpoints[0].tpx_ext['CadenceSensor'] = 'Footpod'
+        with self.assertRaises(ValueError):
+            self.tcx.downsample('CadenceSensor', threshold=50)
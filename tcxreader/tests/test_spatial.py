@@ -0,0 +1,64 @@
+import os
+from unittest import TestCase
+
+from tcxreader.tcx_geo import haversine
+from tcxreader.tcx_spatial import TCXSpatialIndex
+from tcxreader.tcx_track_point import TCXTrackPoint
+from tcxreader.tcxreader import TCXExercise, TCXReader
+
+
+class TestTCXSpatialIndex(TestCase):
+    def setUp(self):
+        data = os.path.join(os.path.dirname(__file__), "data")
+        self.tcx: TCXExercise = TCXReader().read(os.path.join(data, 'cross-country-skiing_activity_1.tcx'))
+        self.tcx_sup: TCXExercise = TCXReader().read(os.path.join(data, 'sup_activity_1.tcx'))
+        self.index = TCXSpatialIndex()
+        self.index.add('ski', self.tcx)
+        self.index.add('sup', self.tcx_sup)
+
+    def test_query_bbox(self):
+        result = self.index.query_bbox(46.0, 15.0, 47.0, 16.0)
+        self.assertEqual(list(result), ['ski'])
+        self.assertEqual(result['ski'], list(range(len(self.tcx.trackpoints))))
+        self.assertEqual(self.index.query_bbox(0.0, 0.0, 1.0, 1.0), {})
+
+    def test_query_radius(self):
+        center = self.tcx.trackpoints[100]
+        result = self.index.query_radius(center.latitude, center.longitude, 50.0)
+        expected = [i for i, tp in enumerate(self.tcx.trackpoints)
+                    if haversine(center.latitude, center.longitude, tp.latitude, tp.longitude) <= 50.0]
+        self.assertEqual(result, {'ski': expected})
+
+    def test_match_segment(self):
+        start, end = self.tcx.trackpoints[100], self.tcx.trackpoints[200]
+        path = [(tp.latitude, tp.longitude) for tp in self.tcx.trackpoints[100:201]]
+        matches = self.index.match_segment(path[0], path[-1], 10.0, path=path)
+
+        def distance(index, point):
+            return haversine(point[0], point[1], self.tcx.trackpoints[index].latitude,
+                             self.tcx.trackpoints[index].longitude)
+
+        # the last point near the start before the traversal and the first point near the end after it
+        first = max(i for i in range(101) if distance(i, path[0]) <= 10.0)
+        last = min(i for i in range(101, len(self.tcx.trackpoints)) if distance(i, path[-1]) <= 10.0)
+        self.assertIn(('ski', first, last), matches)
+        self.assertTrue(all(key == 'ski' for key, _, _ in matches))
+        # the straight line between the endpoints is not the course of the track
+        self.assertNotIn(('ski', first, last),
+                         self.index.match_segment((start.latitude, start.longitude), (end.latitude, end.longitude), 10.0))
+
+    def test_match_segment_detour(self):
+        # passes the start, leaves the segment for a long detour and later crosses the end point
+        detour = TCXExercise(trackpoints=[
+            TCXTrackPoint(latitude=46.0 + i * 0.0001, longitude=15.0 + (0.01 if 2 < i < 8 else 0)) for i in range(11)])
+        direct = TCXExercise(trackpoints=[TCXTrackPoint(latitude=46.0 + i * 0.0001, longitude=15.0) for i in range(11)])
+        index = TCXSpatialIndex()
+        index.add('detour', detour)
+        index.add('direct', direct)
+        self.assertEqual(index.match_segment((46.0, 15.0), (46.001, 15.0), radius=5.0), [('direct', 0, 10)])
+
+    def test_remove(self):
+        self.index.remove('ski')
+        self.assertNotIn('ski', self.index)
+        self.assertEqual(self.index.query_bbox(46.0, 15.0, 47.0, 16.0), {})
+        self.assertEqual(len(self.index), 1)